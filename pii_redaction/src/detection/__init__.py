@@ -0,0 +1,9 @@
+"""
+PII Detection
+Finds PII entities in text with regex patterns and, optionally, AWS Comprehend.
+"""
+
+from .pii_entity import PIIEntity
+from .pii_detector import PIIDetector
+
+__all__ = ['PIIDetector', 'PIIEntity']
\ No newline at end of file
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Async AWS Comprehend PII Detector
+Native-coroutine Comprehend detection for callers running an event loop.
+Falls back to the threaded ComprehendDetector when aioboto3 is not installed.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+from .pii_entity import PIIEntity
+from .comprehend_detector import (
+    ComprehendDetector, COMPREHEND_MAX_WORKERS,
+    batch_indices, pack_batch, scatter_batch_entities
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncComprehendDetector:
+    """
+    Detects PII using AWS Comprehend with aioboto3 coroutines.
+    
+    Use as an async context manager so one client is shared by all requests:
+        
+        async with AsyncComprehendDetector() as detector:
+            results = await detector.detect_pii_many(texts)
+    """
+    
+    def __init__(self, region_name: str = 'us-east-1', max_concurrency: Optional[int] = None):
+        """
+        Initialize async Comprehend detector.
+        
+        Args:
+            region_name: AWS region for Comprehend client
+            max_concurrency: Maximum in-flight Comprehend requests (default: COMPREHEND_MAX_WORKERS)
+        """
+        self.region_name = region_name
+        self.max_concurrency = max_concurrency or COMPREHEND_MAX_WORKERS
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = None
+        self._client_context = None
+        self._fallback_detector = None
+        self._session = self._init_session()
+    
+    def _init_session(self):
+        """Initialize aioboto3 session, or the sync fallback detector."""
+        try:
+            import aioboto3
+            logger.info("✅ aioboto3 session initialized")
+            return aioboto3.Session()
+        except ImportError:
+            logger.warning("⚠️  aioboto3 not installed, falling back to threaded boto3 for Comprehend")
+            self._fallback_detector = ComprehendDetector(self.region_name, self.max_concurrency)
+            return None
+    
+    async def __aenter__(self) -> 'AsyncComprehendDetector':
+        if self._session:
+            try:
+                self._client_context = self._session.client('comprehend', region_name=self.region_name)
+                self._client = await self._client_context.__aenter__()
+            except Exception as e:
+                logger.warning("⚠️  Failed to initialize async Comprehend client: %s", e)
+                self._client_context = None
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._client_context:
+            await self._client_context.__aexit__(exc_type, exc, tb)
+        self._client = None
+        self._client_context = None
+    
+    def is_available(self) -> bool:
+        """Check if Comprehend detection is available."""
+        if self._fallback_detector:
+            return self._fallback_detector.is_available()
+        return self._client is not None
+    
+    async def detect_pii(self, text: str) -> List[PIIEntity]:
+        """
+        Detect PII in a single text.
+        
+        Args:
+            text: Text to analyze
+            
+        Returns:
+            List of detected PII entities
+        """
+        results = await self.detect_pii_batch([text])
+        return results[0]
+    
+    async def detect_pii_many(self, texts: List[str]) -> List[List[PIIEntity]]:
+        """
+        Detect PII with one concurrent request per text.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            List of detected PII entities for each text, in input order
+        """
+        return list(await asyncio.gather(*(self.detect_pii(text) for text in texts)))
+    
+    async def detect_pii_batch(self, texts: List[str]) -> List[List[PIIEntity]]:
+        """
+        Detect PII in many texts, one concurrent request per packed batch.
+        
+        Fewer requests than detect_pii_many, but as with
+        ComprehendDetector.detect_pii_batch, neighbouring texts can change
+        what is detected and entities spanning two texts are dropped.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            List of detected PII entities for each text, in input order
+        """
+        if self._fallback_detector:
+            return await asyncio.to_thread(self._fallback_detector.detect_pii_batch, texts)
+        
+        results = [[] for _ in texts]
+        
+        if not self._client:
+            logger.debug("Async Comprehend client not available")
+            return results
+        
+        await asyncio.gather(*(
+            self._detect_pii_packed(texts, batch, results) for batch in batch_indices(texts)
+        ))
+        
+        return results
+    
+    async def _detect_pii_packed(self, texts: List[str], batch: List[int],
+                                 results: List[List[PIIEntity]]):
+        """Run one Comprehend call over a packed batch and scatter entities into results."""
+        packed_text, offsets = pack_batch(texts, batch)
+        
+        async with self._semaphore:
+            try:
+                response = await self._client.detect_pii_entities(
+                    Text=packed_text,
+                    LanguageCode='en'
+                )
+            except Exception as e:
+                logger.warning("Comprehend batch PII detection failed: %s", e)
+                return
+        
+        count = scatter_batch_entities(texts, batch, offsets, response, results)
+        logger.debug("Comprehend detected %s entities across %s texts", count, len(batch))
\ No newline at end of file
@@ -5,38 +5,183 @@ Handles PII detection using AWS Comprehend services.
 """
 
 import logging
-from typing import List, Optional
+import os
+import sys
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from pii_entity import PIIEntity
+from .pii_entity import PIIEntity
 
 logger = logging.getLogger(__name__)
 
+# DetectPiiEntities has no batch variant, so batches are packed into a single
+# request. Limits keep the packed text well under the 100 KB request cap.
+BATCH_SIZE = 25
+MAX_BATCH_BYTES = 90_000
+BATCH_SEPARATOR = '\n\n'
+
+# Comprehend calls are network-bound, so requests are overlapped on a thread pool
+COMPREHEND_MAX_WORKERS = int(os.environ.get('COMPREHEND_MAX_WORKERS', '16'))
+
+# One client per (region, pool size), shared by every ComprehendDetector
+_CLIENT_CACHE: Dict[Tuple[str, int], Any] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# One thread pool per size, shared the same way, so detectors built per worker
+# process or per file do not each leave a pool of idle threads behind
+_EXECUTOR_CACHE: Dict[int, ThreadPoolExecutor] = {}
+_EXECUTOR_CACHE_LOCK = threading.Lock()
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Get the shared thread pool with max_workers threads, creating it once."""
+    with _EXECUTOR_CACHE_LOCK:
+        executor = _EXECUTOR_CACHE.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='comprehend')
+            _EXECUTOR_CACHE[max_workers] = executor
+        return executor
+
+def _reset_after_fork():
+    """
+    Give a forked child its own clients and pools.
+    
+    Children inherit the pools but not their threads, and the clients' open
+    keep-alive TLS connections, which the parent keeps using. Locks held by
+    another thread at fork time would never be released, so they are replaced.
+    """
+    global _CLIENT_CACHE_LOCK, _EXECUTOR_CACHE_LOCK
+    _CLIENT_CACHE.clear()
+    _CLIENT_CACHE_LOCK = threading.Lock()
+    _EXECUTOR_CACHE.clear()
+    _EXECUTOR_CACHE_LOCK = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def batch_indices(texts: List[str]):
+    """Group indices of non-empty texts into batches within request limits."""
+    batch = []
+    batch_bytes = 0
+    
+    for i, text in enumerate(texts):
+        if not text or text.isspace():
+            continue
+        
+        text_bytes = len(text.encode('utf-8')) + len(BATCH_SEPARATOR)
+        if batch and (len(batch) >= BATCH_SIZE or batch_bytes + text_bytes > MAX_BATCH_BYTES):
+            yield batch
+            batch = []
+            batch_bytes = 0
+        
+        batch.append(i)
+        batch_bytes += text_bytes
+    
+    if batch:
+        yield batch
+
+def pack_batch(texts: List[str], batch: List[int]) -> Tuple[str, List[int]]:
+    """Join a batch of texts into one request text, with each text's offset in it."""
+    offsets = []
+    position = 0
+    for i in batch:
+        offsets.append(position)
+        position += len(texts[i]) + len(BATCH_SEPARATOR)
+    
+    return BATCH_SEPARATOR.join(texts[i] for i in batch), offsets
+
+def scatter_batch_entities(texts: List[str], batch: List[int], offsets: List[int],
+                           response: Dict[str, Any], results: List[List[PIIEntity]]) -> int:
+    """Map entities from a packed-batch response back onto their texts; returns the count kept."""
+    # Entity types are interned so parsed responses share one string per type
+    count = 0
+    for entity in response.get('Entities', []):
+        slot = bisect_right(offsets, entity['BeginOffset']) - 1
+        text = texts[batch[slot]]
+        start_pos = entity['BeginOffset'] - offsets[slot]
+        end_pos = entity['EndOffset'] - offsets[slot]
+        
+        # Entities running across the separator belong to no single text
+        if end_pos > len(text):
+            continue
+        
+        results[batch[slot]].append(PIIEntity(
+            text=text[start_pos:end_pos],
+            entity_type=sys.intern(entity['Type']),
+            start_pos=start_pos,
+            end_pos=end_pos,
+            confidence=entity['Score'],
+            source='COMPREHEND'
+        ))
+        count += 1
+    
+    return count
+
+def _collect_results(results, failed: Optional[Set[int]]) -> List[List[PIIEntity]]:
+    """Replace failed (None) per-text results with empty lists, recording their indices."""
+    collected = []
+    for i, entities in enumerate(results):
+        if entities is None:
+            if failed is not None:
+                failed.add(i)
+            entities = []
+        collected.append(entities)
+    return collected
+
 class ComprehendDetector:
     """Detects PII using AWS Comprehend services."""
     
-    def __init__(self, region_name: str = 'us-east-1'):
+    def __init__(self, region_name: str = 'us-east-1', max_workers: Optional[int] = None):
         """
         Initialize Comprehend detector.
         
         Args:
             region_name: AWS region for Comprehend client
+            max_workers: Concurrent Comprehend requests (default: COMPREHEND_MAX_WORKERS)
         """
         self.region_name = region_name
+        self.max_workers = max_workers or COMPREHEND_MAX_WORKERS
         self.comprehend_client = self._init_client()
     
+    @property
+    def _executor(self) -> ThreadPoolExecutor:
+        """Thread pool for concurrent requests, shared with other detectors of the same size."""
+        return _get_executor(self.max_workers)
+    
     def _init_client(self):
-        """Initialize AWS Comprehend client."""
-        try:
-            import boto3
-            client = boto3.client('comprehend', region_name=self.region_name)
-            logger.info("✅ AWS Comprehend client initialized")
+        """Get the shared AWS Comprehend client for this region, creating it once."""
+        pool_size = max(50, self.max_workers)
+        cache_key = (self.region_name, pool_size)
+        
+        # boto3's default session is not thread-safe, so creation is serialized.
+        # The client itself is thread-safe and shared; boto3 resources are not.
+        with _CLIENT_CACHE_LOCK:
+            if cache_key in _CLIENT_CACHE:
+                return _CLIENT_CACHE[cache_key]
+            
+            try:
+                import boto3
+                from botocore.config import Config
+                
+                # Reused connections amortize TCP + TLS handshakes across detectors
+                config = Config(
+                    max_pool_connections=pool_size,
+                    retries={'mode': 'adaptive', 'total_max_attempts': 5},
+                    tcp_keepalive=True,
+                    connect_timeout=2,
+                    read_timeout=30
+                )
+                client = boto3.client('comprehend', region_name=self.region_name, config=config)
+                logger.info("✅ AWS Comprehend client initialized")
+            except ImportError:
+                logger.warning("⚠️  boto3 not installed, Comprehend detection unavailable")
+                return None
+            except Exception as e:
+                logger.warning("⚠️  Failed to initialize Comprehend: %s", e)
+                return None
+            
+            _CLIENT_CACHE[cache_key] = client
             return client
-        except ImportError:
-            logger.warning("⚠️  boto3 not installed, Comprehend detection unavailable")
-            return None
-        except Exception as e:
-            logger.warning(f"⚠️  Failed to initialize Comprehend: {e}")
-            return None
     
     def is_available(self) -> bool:
         """Check if Comprehend detection is available."""
@@ -50,13 +195,18 @@ class ComprehendDetector:
             text: Text to analyze
             
         Returns:
-            List of detected PII entities
+            List of detected PII entities (empty if the call failed)
         """
+        entities = self._detect_pii(text)
+        return entities if entities is not None else []
+    
+    def _detect_pii(self, text: str) -> Optional[List[PIIEntity]]:
+        """Detect PII in one text, or return None if the Comprehend call failed."""
         if not self.comprehend_client:
             logger.debug("Comprehend client not available")
             return []
         
-        if not text or not text.strip():
+        if not text or text.isspace():
             return []
         
         entities = []
@@ -70,7 +220,7 @@ class ComprehendDetector:
             for entity in response.get('Entities', []):
                 pii_entity = PIIEntity(
                     text=text[entity['BeginOffset']:entity['EndOffset']],
-                    entity_type=entity['Type'],
+                    entity_type=sys.intern(entity['Type']),
                     start_pos=entity['BeginOffset'],
                     end_pos=entity['EndOffset'],
                     confidence=entity['Score'],
@@ -78,13 +228,78 @@ class ComprehendDetector:
                 )
                 entities.append(pii_entity)
             
-            logger.debug(f"Comprehend detected {len(entities)} entities")
+            logger.debug("Comprehend detected %s entities", len(entities))
             
         except Exception as e:
-            logger.warning(f"Comprehend PII detection failed: {e}")
+            logger.warning("Comprehend PII detection failed: %s", e)
+            return None
         
         return entities
     
+    def detect_pii_batch(self, texts: List[str], failed: Optional[Set[int]] = None) -> List[List[PIIEntity]]:
+        """
+        Detect PII in many texts with one Comprehend call per packed batch.
+        
+        Up to BATCH_SIZE texts are joined into a single request and entity
+        offsets are mapped back to the text they came from. Comprehend reads
+        the joined texts as one document, so neighbouring texts can change
+        what it detects, and entities spanning two texts are dropped. Use
+        detect_pii_many where results must match one call per text.
+        
+        Args:
+            texts: Texts to analyze
+            failed: Set receiving the index of every text whose call failed,
+                so callers can tell an empty result from a missing one
+            
+        Returns:
+            List of detected PII entities for each text, in input order
+        """
+        results = [[] for _ in texts]
+        
+        if not self.comprehend_client:
+            logger.debug("Comprehend client not available")
+            return results
+        
+        # Batches write to disjoint result slots, so they can run concurrently
+        list(self._executor.map(
+            lambda batch: self._detect_pii_packed(texts, batch, results, failed),
+            batch_indices(texts)
+        ))
+        
+        return results
+    
+    def detect_pii_many(self, texts: List[str], failed: Optional[Set[int]] = None) -> List[List[PIIEntity]]:
+        """
+        Detect PII in many texts with one concurrent Comprehend call per text.
+        
+        Args:
+            texts: Texts to analyze
+            failed: Set receiving the index of every text whose call failed
+            
+        Returns:
+            List of detected PII entities for each text, in input order
+        """
+        return _collect_results(self._executor.map(self._detect_pii, texts), failed)
+    
+    def _detect_pii_packed(self, texts: List[str], batch: List[int], 
+                           results: List[List[PIIEntity]], failed: Optional[Set[int]] = None):
+        """Run one Comprehend call over a packed batch and scatter entities into results."""
+        packed_text, offsets = pack_batch(texts, batch)
+        
+        try:
+            response = self.comprehend_client.detect_pii_entities(
+                Text=packed_text,
+                LanguageCode='en'
+            )
+        except Exception as e:
+            logger.warning("Comprehend batch PII detection failed: %s", e)
+            if failed is not None:
+                failed.update(batch)
+            return
+        
+        count = scatter_batch_entities(texts, batch, offsets, response, results)
+        logger.debug("Comprehend detected %s entities across %s texts", count, len(batch))
+    
     def detect_entities_with_cer(self, text: str, cer_endpoint_arn: str) -> List[PIIEntity]:
         """
         Detect entities using a Custom Entity Recognizer endpoint.
@@ -94,13 +309,18 @@ class ComprehendDetector:
             cer_endpoint_arn: ARN of the CER endpoint
             
         Returns:
-            List of detected entities
+            List of detected entities (empty if the call failed)
         """
+        entities = self._detect_entities_with_cer(text, cer_endpoint_arn)
+        return entities if entities is not None else []
+    
+    def _detect_entities_with_cer(self, text: str, cer_endpoint_arn: str) -> Optional[List[PIIEntity]]:
+        """Detect entities in one text with a CER endpoint, or return None if the call failed."""
         if not self.comprehend_client:
             logger.debug("Comprehend client not available")
             return []
         
-        if not text or not text.strip():
+        if not text or text.isspace():
             return []
         
         entities = []
@@ -115,7 +335,7 @@ class ComprehendDetector:
             for entity in response.get('Entities', []):
                 pii_entity = PIIEntity(
                     text=text[entity['BeginOffset']:entity['EndOffset']],
-                    entity_type=entity['Type'],
+                    entity_type=sys.intern(entity['Type']),
                     start_pos=entity['BeginOffset'],
                     end_pos=entity['EndOffset'],
                     confidence=entity['Score'],
@@ -123,13 +343,31 @@ class ComprehendDetector:
                 )
                 entities.append(pii_entity)
             
-            logger.debug(f"CER detected {len(entities)} entities")
+            logger.debug("CER detected %s entities", len(entities))
             
         except Exception as e:
-            logger.warning(f"CER detection failed: {e}")
+            logger.warning("CER detection failed: %s", e)
+            return None
         
         return entities
     
+    def detect_entities_with_cer_many(self, texts: List[str], cer_endpoint_arn: str,
+                                      failed: Optional[Set[int]] = None) -> List[List[PIIEntity]]:
+        """
+        Detect entities in many texts with concurrent CER endpoint calls.
+        
+        Args:
+            texts: Texts to analyze
+            cer_endpoint_arn: ARN of the CER endpoint
+            failed: Set receiving the index of every text whose call failed
+            
+        Returns:
+            List of detected entities for each text, in input order
+        """
+        return _collect_results(self._executor.map(
+            lambda text: self._detect_entities_with_cer(text, cer_endpoint_arn), texts
+        ), failed)
+    
     def test_connection(self) -> bool:
         """
         Test connection to AWS Comprehend.
@@ -149,5 +387,5 @@ class ComprehendDetector:
             logger.info("✅ Comprehend connection test successful")
             return True
         except Exception as e:
-            logger.warning(f"❌ Comprehend connection test failed: {e}")
+            logger.warning("❌ Comprehend connection test failed: %s", e)
             return False
\ No newline at end of file
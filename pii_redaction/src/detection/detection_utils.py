@@ -3,8 +3,63 @@
 Utility functions for PII detection.
 """
 
-from typing import List
-from pii_entity import PIIEntity
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from .pii_entity import PIIEntity
+
+# numba and numpy are imported on the first sweep large enough to use them;
+# importing numba eagerly slows every worker process start
+np = None
+_sweep_overlaps_jit = None
+_jit_loaded = False
+_jit_lock = threading.Lock()
+
+# Below this many entities, converting to arrays costs more than the JIT saves
+JIT_SWEEP_MIN_ENTITIES = 256
+
+class EntityCache:
+    """Thread-safe LRU cache of detected entities keyed by the exact text."""
+    
+    def __init__(self, maxsize: int = 10000):
+        """
+        Initialize entity cache.
+        
+        Args:
+            maxsize: Maximum number of texts to keep
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, text: str) -> Optional[Tuple[PIIEntity, ...]]:
+        """Get cached entities for text, or None on a miss."""
+        with self._lock:
+            entities = self._entries.get(text)
+            if entities is not None:
+                self._entries.move_to_end(text)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entities
+    
+    def put(self, text: str, entities: List[PIIEntity]):
+        """Cache entities for text, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[text] = tuple(entities)
+            self._entries.move_to_end(text)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
 def deduplicate_entities(entities: List[PIIEntity]) -> List[PIIEntity]:
     """
@@ -19,29 +74,86 @@ def deduplicate_entities(entities: List[PIIEntity]) -> List[PIIEntity]:
     if not entities:
         return []
     
-    # Sort by start position
-    sorted_entities = sorted(entities, key=lambda x: x.start_pos)
-    
-    deduplicated = []
-    for entity in sorted_entities:
-        # Check for overlap with existing entities
-        overlaps = False
-        for i, existing in enumerate(deduplicated):
-            if entities_overlap(entity, existing):
-                # Overlap detected - keep the one with higher confidence
-                if entity.confidence > existing.confidence:
-                    deduplicated[i] = entity
-                overlaps = True
-                break
+    # Structure-of-arrays view: each entity's position and score is read once
+    starts = [entity.start_pos for entity in entities]
+    ends = [entity.end_pos for entity in entities]
+    confidences = [entity.confidence for entity in entities]
+    
+    if len(entities) >= JIT_SWEEP_MIN_ENTITIES and _load_jit_sweep():
+        kept = _dedup_indices_jit(starts, ends, confidences)
+    else:
+        # Sort by start position, highest confidence first among equal starts;
+        # a bound __getitem__ key avoids calling a lambda per element
+        sort_keys = [(start, end > start, -confidence)
+                     for start, end, confidence in zip(starts, ends, confidences)]
+        order = sorted(range(len(entities)), key=sort_keys.__getitem__)
+        kept = _sweep_overlaps(order, starts, ends, confidences)
+    
+    # The sweep keeps non-overlapping entities in start order, so no re-sort
+    return [entities[i] for i in kept]
+
+def _sweep_overlaps(order: List[int], starts: List[int], ends: List[int],
+                    confidences: List[float]) -> List[int]:
+    """
+    Sweep entities in sorted order, resolving overlaps by confidence.
+    
+    Kept entities never overlap each other, so each entity can only overlap
+    the most recently kept one. That needs zero-length entities, which overlap
+    nothing starting where they do, sorted before longer ones at the same start.
+    
+    Returns:
+        Indices of kept entities, in sweep order
+    """
+    first = order[0]
+    kept = [first]
+    last_start, last_end, last_confidence = starts[first], ends[first], confidences[first]
+    
+    for i in order[1:]:
+        start, end = starts[i], ends[i]
         
-        if not overlaps:
-            deduplicated.append(entity)
+        # Inlined entities_overlap; & evaluates both comparisons without a jump
+        if (start < last_end) & (end > last_start):
+            # Overlap detected - keep the one with higher confidence
+            if confidences[i] > last_confidence:
+                kept[-1] = i
+                last_start, last_end, last_confidence = start, end, confidences[i]
+        else:
+            kept.append(i)
+            last_start, last_end, last_confidence = start, end, confidences[i]
+    
+    return kept
+
+def _load_jit_sweep() -> bool:
+    """Compile the sweep with numba on first use; False when numba is not installed."""
+    global np, _sweep_overlaps_jit, _jit_loaded
+    if not _jit_loaded:
+        with _jit_lock:
+            if not _jit_loaded:
+                try:
+                    import numpy
+                    from numba import njit
+                    np = numpy
+                    _sweep_overlaps_jit = njit(cache=True)(_sweep_overlaps)
+                except ImportError:
+                    pass
+                _jit_loaded = True
+    return _sweep_overlaps_jit is not None
+
+def _dedup_indices_jit(starts: List[int], ends: List[int], confidences: List[float]) -> List[int]:
+    """Sort and sweep with NumPy arrays and the compiled sweep; needs _load_jit_sweep() first."""
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    confidences = np.asarray(confidences, dtype=np.float64)
     
-    return sorted(deduplicated, key=lambda x: x.start_pos)
+    # lexsort is stable and sorts by its last key first: start, then
+    # zero-length entities first, then -confidence
+    order = np.lexsort((-confidences, ends > starts, starts))
+    return _sweep_overlaps_jit(order, starts, ends, confidences)
 
 def entities_overlap(entity1: PIIEntity, entity2: PIIEntity) -> bool:
     """
     Check if two entities overlap in text position.
+    Kept for external callers; deduplicate_entities inlines this check.
     
     Args:
         entity1: First entity
@@ -5,29 +5,52 @@ Combines regex detection with optional AWS Comprehend detection.
 """
 
 import logging
-from typing import List, Optional
+import re
+from typing import List, Optional, Set
 
-from pii_entity import PIIEntity
-from regex_detector import RegexDetector
-from comprehend_detector import ComprehendDetector
-from detection_utils import merge_entity_lists
+from .pii_entity import PIIEntity
+from .regex_detector import RegexDetector
+from .comprehend_detector import ComprehendDetector
+from .detection_utils import EntityCache, merge_entity_lists
 
 logger = logging.getLogger(__name__)
 
+# Regex hits on both of these mean Comprehend is unlikely to add recall
+COMPREHEND_SKIP_TYPES = frozenset({'EMAIL', 'PHONE'})
+
+# Any letter left outside the regex spans could belong to a name only Comprehend finds
+_LETTER = re.compile(r'[^\W\d_]')
+
 class PIIDetector:
     """Main PII detector that combines multiple detection methods."""
     
-    def __init__(self, use_comprehend: bool = False, cer_endpoint_arn: Optional[str] = None):
+    def __init__(self, use_comprehend: bool = False, cer_endpoint_arn: Optional[str] = None,
+                 cache_size: int = 10000, comprehend_skip_coverage: Optional[float] = None,
+                 pack_comprehend_batches: bool = False):
         """
         Initialize the PII detector.
         
         Args:
             use_comprehend: Whether to use AWS Comprehend built-in PII detection
             cer_endpoint_arn: Optional CER endpoint ARN for custom entity recognition
+            cache_size: Number of texts whose results are cached (0 disables caching)
+            comprehend_skip_coverage: Opt-in fraction of characters covered by regex
+                entities at which the Comprehend call is skipped, provided no letters
+                remain outside them (None, the default, always calls Comprehend)
+            pack_comprehend_batches: Opt in to joining up to BATCH_SIZE texts per
+                Comprehend request instead of one concurrent request per text. Fewer
+                calls, but neighbouring texts can change what Comprehend detects and
+                entities spanning two texts are dropped
         """
         self.regex_detector = RegexDetector()
+        
+        # Repeated utterances skip regex and Comprehend entirely. Keys are the
+        # exact text, since entity offsets are only valid for that text.
+        self._cache = EntityCache(cache_size) if cache_size else None
         self.use_comprehend = use_comprehend
         self.cer_endpoint_arn = cer_endpoint_arn
+        self.comprehend_skip_coverage = comprehend_skip_coverage
+        self.pack_comprehend_batches = pack_comprehend_batches
         
         # Initialize Comprehend detector if requested
         self.comprehend_detector = None
@@ -47,35 +70,149 @@ class PIIDetector:
         Returns:
             List of detected PII entities (deduplicated)
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return []
         
-        entity_lists = []
+        if self._cache is not None:
+            cached = self._cache.get(text)
+            if cached is not None:
+                return list(cached)
+        
+        failed = set()
+        all_entities = self._detect_pii_batch_uncached([text], failed)[0]
+        
+        # After a failed Comprehend or CER call the result is incomplete; it is
+        # not cached, so the text is detected again next time
+        if self._cache is not None and not failed:
+            self._cache.put(text, all_entities)
+        
+        logger.info("Total detected %s PII entities in text: '%s...'", len(all_entities), text[:50])
+        return all_entities
+    
+    def detect_pii_batch(self, texts: List[str]) -> List[List[PIIEntity]]:
+        """
+        Detect PII in many texts, batching Comprehend calls.
+        
+        Args:
+            texts: Texts to analyze
+            
+        Returns:
+            List of detected PII entities (deduplicated) for each text, in input order
+        """
+        results = [None] * len(texts)
+        
+        # Serve cached texts, and detect each distinct uncached text only once
+        pending = {}
+        for i, text in enumerate(texts):
+            cached = self._cache.get(text) if self._cache is not None else None
+            if cached is not None:
+                results[i] = list(cached)
+            else:
+                pending.setdefault(text, []).append(i)
+        
+        pending_texts = list(pending)
+        failed = set()
+        detected = self._detect_pii_batch_uncached(pending_texts, failed)
+        
+        for j, (text, entities) in enumerate(zip(pending_texts, detected)):
+            # Incomplete results from failed Comprehend or CER calls are not cached
+            if self._cache is not None and j not in failed:
+                self._cache.put(text, entities)
+            for i in pending[text]:
+                results[i] = list(entities)
+        
+        logger.info("Total detected %s PII entities across %s texts",
+                    sum(len(r) for r in results), len(texts))
+        if self._cache is not None:
+            logger.debug("Entity cache: %s hits, %s misses (%.0f%% hit rate), %s entries",
+                         self._cache.hits, self._cache.misses, self._cache.hit_rate() * 100,
+                         len(self._cache))
+        return results
+    
+    def _detect_pii_batch_uncached(self, texts: List[str],
+                                   failed: Optional[Set[int]] = None) -> List[List[PIIEntity]]:
+        """
+        Run every available detection method on texts, overlapping Comprehend calls.
         
+        Args:
+            texts: Texts to analyze
+            failed: Set receiving the index of every text whose Comprehend or CER call failed
+            
+        Returns:
+            List of detected PII entities (deduplicated) for each text, in input order
+        """
         # Always use regex detection
-        regex_entities = self.regex_detector.detect(text)
-        entity_lists.append(regex_entities)
-        logger.debug(f"Regex found {len(regex_entities)} entities")
+        entity_lists_per_text = [[self.regex_detector.detect(text)] for text in texts]
         
-        # Use Comprehend built-in PII detection if available
+        # Comprehend built-in PII detection for texts not covered by regex: one
+        # concurrent call per text, or per packed batch of texts when opted in
         if self.use_comprehend and self.comprehend_detector:
-            comprehend_entities = self.comprehend_detector.detect_pii(text)
-            entity_lists.append(comprehend_entities)
-            logger.debug(f"Comprehend found {len(comprehend_entities)} entities")
+            uncovered = [
+                i for i, text in enumerate(texts)
+                if not self._regex_covers(text, entity_lists_per_text[i][0])
+            ]
+            if self.pack_comprehend_batches:
+                detect_comprehend = self.comprehend_detector.detect_pii_batch
+            else:
+                detect_comprehend = self.comprehend_detector.detect_pii_many
+            comprehend_failed = set()
+            comprehend_results = detect_comprehend([texts[i] for i in uncovered], comprehend_failed)
+            for i, comprehend_entities in zip(uncovered, comprehend_results):
+                entity_lists_per_text[i].append(comprehend_entities)
+            if failed is not None:
+                failed.update(uncovered[j] for j in comprehend_failed)
         
-        # Use CER if endpoint provided
+        # CER endpoints have no batch API, so they are called concurrently per text
         if self.cer_endpoint_arn and self.comprehend_detector:
-            cer_entities = self.comprehend_detector.detect_entities_with_cer(
-                text, self.cer_endpoint_arn
+            cer_results = self.comprehend_detector.detect_entities_with_cer_many(
+                texts, self.cer_endpoint_arn, failed
             )
-            entity_lists.append(cer_entities)
-            logger.debug(f"CER found {len(cer_entities)} entities")
+            for entity_lists, cer_entities in zip(entity_lists_per_text, cer_results):
+                entity_lists.append(cer_entities)
         
         # Merge all entity lists and deduplicate
-        all_entities = merge_entity_lists(*entity_lists)
+        return [merge_entity_lists(*entity_lists) for entity_lists in entity_lists_per_text]
+    
+    def _regex_covers(self, text: str, regex_entities: List[PIIEntity]) -> bool:
+        """
+        Check whether regex results are dense enough to skip the Comprehend call.
         
-        logger.info(f"Total detected {len(all_entities)} PII entities in text: '{text[:50]}...'")
-        return all_entities
+        Args:
+            text: Text that was analyzed
+            regex_entities: Entities found by regex detection
+            
+        Returns:
+            True if Comprehend can be skipped for this text
+        """
+        if self.comprehend_skip_coverage is None or not regex_entities:
+            return False
+        
+        # Merge overlapping spans so no character is counted twice, and keep
+        # calling Comprehend while any uncovered text could hold a name:
+        # however much regex covers, it never shows a PERSON is absent
+        covered = 0
+        position = 0
+        for entity in sorted(regex_entities, key=lambda entity: entity.start_pos):
+            if entity.end_pos <= position:
+                continue
+            start = max(entity.start_pos, position)
+            if _LETTER.search(text, position, start):
+                return False
+            covered += entity.end_pos - start
+            position = entity.end_pos
+        if _LETTER.search(text, position):
+            return False
+        
+        if COMPREHEND_SKIP_TYPES <= {entity.entity_type for entity in regex_entities}:
+            logger.debug("Regex found EMAIL and PHONE, skipping Comprehend")
+            return True
+        
+        coverage = covered / max(1, len(text))
+        if coverage >= self.comprehend_skip_coverage:
+            logger.debug("Regex covers %.0f%% of text, skipping Comprehend", coverage * 100)
+            return True
+        
+        return False
     
     def get_detection_info(self) -> dict:
         """Get information about available detection methods."""
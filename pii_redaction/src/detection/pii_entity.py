@@ -2,11 +2,12 @@
 """
 PII Entity Data Structure
 Simple dataclass to represent detected PII entities.
+Slotted and frozen: no per-instance __dict__, and entities are hashable.
 """
 
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PIIEntity:
     """Represents a detected PII entity."""
     text: str           # The actual PII text found
@@ -4,6 +4,9 @@ PII Regex Patterns
 Centralized collection of regex patterns for detecting different types of PII.
 """
 
+import itertools
+import re
+
 # Regex patterns for common PII types
 PII_PATTERNS = {
     'EMAIL': [
@@ -44,6 +47,73 @@ PII_PATTERNS = {
     ]
 }
 
+# Patterns compiled once at import so detectors don't pay compile/cache cost per call
+COMPILED_PII_PATTERNS = {
+    entity_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for entity_type, patterns in PII_PATTERNS.items()
+}
+
+# Match group holding the PII for each type's patterns (default: whole match)
+CAPTURE_GROUPS = {
+    'NAME': 1  # Group 1 is the name after the context phrase
+}
+
+# Flat (entity_type, compiled pattern, group) list in declaration order; list
+# positions double as pattern ids for multi-pattern scanners
+COMPILED_PATTERN_LIST = [
+    (entity_type, pattern, CAPTURE_GROUPS.get(entity_type, 0) if pattern.groups else 0)
+    for entity_type, patterns in COMPILED_PII_PATTERNS.items()
+    for pattern in patterns
+]
+
+# Character class a text must contain for each pattern to possibly match,
+# in pattern order (None: no cheap prerequisite)
+PATTERN_PREREQUISITES = {
+    'EMAIL': ['@', '@'],
+    'PHONE': ['digit', 'digit', 'digit'],
+    'SSN': ['digit'],
+    'ZIP_CODE': ['digit'],
+    'ADDRESS': ['digit', ','],
+    'CREDIT_CARD': ['digit'],
+    'NAME': [None, None]
+}
+
+def _build_prefiltered_patterns():
+    """
+    Precompute the runnable patterns for every combination of text features.
+    
+    Each entry also fuses its patterns into one alternation. A single search
+    answers "could any pattern match?", so PII-free text is scanned once
+    instead of once per pattern. Matches from the fused pattern are not used
+    directly: alternation only yields non-overlapping matches, while
+    detection needs every pattern's matches.
+    
+    Returns:
+        Dict of (has_digit, has_at, has_comma) -> (pattern list, fused pattern)
+    """
+    # Patterns without a listed prerequisite always run
+    prerequisites = []
+    for entity_type, patterns in COMPILED_PII_PATTERNS.items():
+        listed = PATTERN_PREREQUISITES.get(entity_type, [])
+        prerequisites.extend(listed[i] if i < len(listed) else None for i in range(len(patterns)))
+    
+    prefiltered = {}
+    for key in itertools.product((False, True), repeat=3):
+        present = {None: True, 'digit': key[0], '@': key[1], ',': key[2]}
+        patterns = [
+            entry for entry, prerequisite in zip(COMPILED_PATTERN_LIST, prerequisites)
+            if present[prerequisite]
+        ]
+        fused = re.compile(
+            '|'.join(f"(?:{pattern.pattern})" for _, pattern, _ in patterns),
+            re.IGNORECASE
+        )
+        prefiltered[key] = (patterns, fused)
+    
+    return prefiltered
+
+PREFILTERED_PATTERNS = _build_prefiltered_patterns()
+
 # Known false positives to filter out
 FALSE_POSITIVES = {
     'EMAIL': ['@gmail', '@yahoo', '@hotmail'],  # Incomplete emails
@@ -51,6 +121,13 @@ FALSE_POSITIVES = {
     'ADDRESS': ['New York', 'Test Lane']  # Too generic
 }
 
+# Lowercased once so is_false_positive is a single set lookup
+FALSE_POSITIVES_LOWER = {
+    entity_type: frozenset(fp.lower() for fp in false_positives)
+    for entity_type, false_positives in FALSE_POSITIVES.items()
+}
+_EMPTY_SET = frozenset()
+
 def get_patterns_for_type(entity_type: str):
     """Get regex patterns for a specific PII type."""
     return PII_PATTERNS.get(entity_type, [])
@@ -61,6 +138,4 @@ def get_all_pattern_types():
 
 def is_false_positive(entity_type: str, text: str) -> bool:
     """Check if detected text is a known false positive."""
-    if entity_type in FALSE_POSITIVES:
-        return text.lower() in [fp.lower() for fp in FALSE_POSITIVES[entity_type]]
-    return False
\ No newline at end of file
+    return text.lower() in FALSE_POSITIVES_LOWER.get(entity_type, _EMPTY_SET)
\ No newline at end of file
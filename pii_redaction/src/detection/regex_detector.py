@@ -4,15 +4,37 @@ Regex-based PII Detector
 Uses regex patterns to detect PII in text.
 """
 
-import re
+import hashlib
 import logging
-from typing import List
+import os
+import platform
+import re
+import threading
+from typing import FrozenSet, List, Optional
 
-from pii_entity import PIIEntity
-from pii_patterns import PII_PATTERNS, is_false_positive
+from .pii_entity import PIIEntity
+from .pii_patterns import COMPILED_PATTERN_LIST, PREFILTERED_PATTERNS, FALSE_POSITIVES_LOWER
 
 logger = logging.getLogger(__name__)
 
+# Python treats these ASCII separators as \s; Hyperscan does not
+_HYPERSCAN_SPACE_MAP = str.maketrans('\x1c\x1d\x1e\x1f', '    ')
+
+# RE2's \s also leaves out vertical tab
+_RE2_SPACE_MAP = str.maketrans('\x0b\x1c\x1d\x1e\x1f', '     ')
+
+_DIGIT_RE = re.compile(r'\d')
+
+# Multi-pattern engines are compiled once per process and shared by every RegexDetector
+_COMPILED_ENGINES = {}
+_COMPILE_LOCK = threading.Lock()
+
+# Serialized Hyperscan databases persist here, so new worker processes skip compilation
+HYPERSCAN_CACHE_DIR = os.environ.get(
+    'PII_REDACTION_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'pii_redaction')
+)
+
 class RegexDetector:
     """Detects PII using regex patterns."""
     
@@ -24,6 +46,96 @@ class RegexDetector:
             confidence_score: Default confidence score for regex matches
         """
         self.confidence_score = confidence_score
+        self._hyperscan = None
+        self._hyperscan_db = self._init_hyperscan()
+        self._hyperscan_scratch = threading.local()
+        self._re2_gates = self._init_re2_gates() if self._hyperscan_db is None else None
+    
+    def _init_hyperscan(self):
+        """Get the Hyperscan database for all patterns, if hyperscan is installed."""
+        try:
+            import hyperscan
+        except ImportError:
+            logger.debug("hyperscan not installed, prefiltering with re")
+            return None
+        
+        try:
+            with _COMPILE_LOCK:
+                database = _COMPILED_ENGINES.get('hyperscan')
+                if database is None:
+                    database = self._load_or_compile_hyperscan(hyperscan)
+                    _COMPILED_ENGINES['hyperscan'] = database
+            self._hyperscan = hyperscan
+            return database
+        except Exception as e:
+            logger.warning("⚠️  Failed to compile Hyperscan database: %s", e)
+            return None
+    
+    def _load_or_compile_hyperscan(self, hyperscan):
+        """Load the Hyperscan database from the disk cache, compiling and caching it on a miss."""
+        expressions = [pattern.pattern.encode() for _, pattern, _ in COMPILED_PATTERN_LIST]
+        # SINGLEMATCH: we only need to know which patterns match somewhere
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+        
+        # Serialized databases are specific to the patterns, library version and CPU
+        key = hashlib.sha256(repr((
+            expressions, flags, getattr(hyperscan, '__version__', None), platform.machine()
+        )).encode()).hexdigest()
+        cache_path = os.path.join(HYPERSCAN_CACHE_DIR, f"hyperscan-{key[:16]}.db")
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                database = hyperscan.loadb(f.read(), hyperscan.HS_MODE_BLOCK)
+            logger.info("✅ Hyperscan pattern database loaded from cache")
+            return database
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug("Ignoring unusable Hyperscan cache %s: %s", cache_path, e)
+        
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            flags=[flags] * len(expressions)
+        )
+        logger.info("✅ Hyperscan pattern database compiled")
+        
+        try:
+            os.makedirs(HYPERSCAN_CACHE_DIR, exist_ok=True)
+            # Written aside and renamed, so concurrent workers never read a partial file
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(hyperscan.dumpb(database))
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.debug("Could not write Hyperscan cache %s: %s", cache_path, e)
+        
+        return database
+    
+    def _init_re2_gates(self):
+        """Compile the fused prefilter patterns with RE2, if re2 is installed."""
+        try:
+            import re2
+        except ImportError:
+            logger.debug("re2 not installed, prefilter gate uses re")
+            return None
+        
+        try:
+            with _COMPILE_LOCK:
+                gates = _COMPILED_ENGINES.get('re2')
+                if gates is None:
+                    # RE2 matches in linear time, so the gate never backtracks on long texts
+                    gates = {
+                        features: re2.compile(f"(?i){fused.pattern}")
+                        for features, (_, fused) in PREFILTERED_PATTERNS.items()
+                    }
+                    _COMPILED_ENGINES['re2'] = gates
+                    logger.info("✅ RE2 prefilter gates compiled")
+            return gates
+        except Exception as e:
+            logger.warning("⚠️  Failed to compile RE2 prefilter gates: %s", e)
+            return None
     
     def detect(self, text: str) -> List[PIIEntity]:
         """
@@ -35,40 +147,90 @@ class RegexDetector:
         Returns:
             List of detected PII entities
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return []
         
         entities = []
         
-        for entity_type, patterns in PII_PATTERNS.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
+        for entity_type, pattern, group in self._candidate_patterns(text):
+            # Resolved once per pattern; most types have no false positives to check
+            false_positives = FALSE_POSITIVES_LOWER.get(entity_type)
+            matches = pattern.finditer(text)
+            
+            for match in matches:
+                entity = self._create_entity_from_match(
+                    match, entity_type, group
+                )
                 
-                for match in matches:
-                    entity = self._create_entity_from_match(
-                        match, entity_type, text
-                    )
-                    
-                    if entity and self._is_valid_entity(entity):
-                        entities.append(entity)
-        
-        logger.debug(f"Regex detected {len(entities)} entities")
+                if entity and self._is_valid_entity(entity, false_positives):
+                    entities.append(entity)
+        
+        logger.debug("Regex detected %s entities", len(entities))
         return entities
     
-    def _create_entity_from_match(self, match, entity_type: str, text: str) -> PIIEntity:
-        """Create PIIEntity from regex match."""
-        # For NAME patterns with groups, extract the captured group
-        if entity_type == 'NAME' and match.groups():
-            matched_text = match.group(1)
-            start_pos = match.start(1)
-            end_pos = match.end(1)
+    def _candidate_patterns(self, text: str) -> list:
+        """
+        Find the patterns that can match somewhere in text, in declaration order.
+        
+        Only a prefilter: the returned patterns are still run with re, so
+        results are identical whichever scanner answered.
+        """
+        # Hyperscan's caseless/\d/\b semantics only agree with Python's on ASCII
+        if self._hyperscan_db is not None and text.isascii():
+            matched_ids = self._hyperscan_scan(text)
+            return [COMPILED_PATTERN_LIST[i] for i in sorted(matched_ids)]
+        
+        # Skip pattern families whose required characters are absent
+        features = (_DIGIT_RE.search(text) is not None, '@' in text, ',' in text)
+        patterns, fused = PREFILTERED_PATTERNS[features]
+        
+        # One pass over the text rules out every remaining pattern at once.
+        # RE2's \b, \d and case folding only agree with Python's on ASCII.
+        if self._re2_gates is not None and text.isascii():
+            found = self._re2_gates[features].search(text.translate(_RE2_SPACE_MAP))
         else:
-            matched_text = match.group(0)
-            start_pos = match.start()
-            end_pos = match.end()
+            found = fused.search(text)
+        
+        if not found:
+            return []
+        return patterns
+    
+    def _hyperscan_scan(self, text: str) -> set:
+        """Return ids of patterns with at least one match in text."""
+        scratch = getattr(self._hyperscan_scratch, 'scratch', None)
+        if scratch is None:
+            # Scratch space is per-thread; the database itself is shared
+            scratch = self._hyperscan.Scratch(self._hyperscan_db)
+            self._hyperscan_scratch.scratch = scratch
+        
+        matched_ids = set()
+        
+        def on_match(pattern_id, start, end, flags, context):
+            matched_ids.add(pattern_id)
+        
+        self._hyperscan_db.scan(
+            text.translate(_HYPERSCAN_SPACE_MAP).encode('ascii'),
+            match_event_handler=on_match,
+            scratch=scratch
+        )
+        return matched_ids
+    
+    def _create_entity_from_match(self, match, entity_type: str, group: int) -> PIIEntity:
+        """
+        Create PIIEntity from regex match.
+        
+        Args:
+            match: Regex match object
+            entity_type: Type of PII the pattern detects
+            group: Match group holding the PII, precomputed per pattern
+            
+        Returns:
+            PIIEntity for the matched group
+        """
+        start_pos, end_pos = match.span(group)
         
         return PIIEntity(
-            text=matched_text,
+            text=match.group(group),
             entity_type=entity_type,
             start_pos=start_pos,
             end_pos=end_pos,
@@ -76,14 +238,24 @@ class RegexDetector:
             source='REGEX'
         )
     
-    def _is_valid_entity(self, entity: PIIEntity) -> bool:
-        """Validate detected entity."""
+    def _is_valid_entity(self, entity: PIIEntity,
+                         false_positives: Optional[FrozenSet[str]] = None) -> bool:
+        """
+        Validate detected entity.
+        
+        Args:
+            entity: Entity to validate
+            false_positives: Lowercased false positives for the entity's type, if any
+            
+        Returns:
+            True if the entity should be kept
+        """
         # Skip very short matches
         if len(entity.text.strip()) < 2:
             return False
         
         # Check against known false positives
-        if is_false_positive(entity.entity_type, entity.text):
+        if false_positives and entity.text.lower() in false_positives:
             return False
         
         return True
\ No newline at end of file
@@ -6,6 +6,7 @@ Complete voice metadata PII detection and redaction system.
 
 import argparse
 import logging
+import os
 import sys
 import time
 from typing import Dict, Any
@@ -31,15 +32,56 @@ def create_config_from_args(args) -> tuple:
     
     detection_config = {
         'use_comprehend': args.use_comprehend,
-        'cer_endpoint_arn': args.cer_endpoint
+        'cer_endpoint_arn': args.cer_endpoint,
+        'pack_comprehend_batches': args.pack_comprehend_batches,
+        'max_workers': args.workers
     }
     
     redaction_config = {
-        'strategy': args.strategy
+        'strategy': args.strategy,
+        'metadata_sidecar': args.metadata_sidecar
     }
     
     return detection_config, redaction_config
 
+def parse_positive_int(value: str) -> int:
+    """Parse a command line count that must be at least 1."""
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    return count
+
+def parse_workers(value: str):
+    """Parse --workers: a positive worker count, or 'auto' to tune it on this host."""
+    return value if value == 'auto' else parse_positive_int(value)
+
+def create_file_pairs(input_files: list, output: str = None) -> list:
+    """
+    Pair each input file with its output path.
+    
+    Args:
+        input_files: Input JSON file paths
+        output: Output file for a single input, or output directory for several
+        
+    Returns:
+        List of (input_file, output_file) tuples; output_file is None without output
+    """
+    if len(input_files) == 1 or not output:
+        return [(input_file, output) if len(input_files) == 1 else (input_file, None)
+                for input_file in input_files]
+    
+    # Several inputs keep their file names inside the output directory
+    names = [os.path.basename(input_file) for input_file in input_files]
+    if len(set(names)) != len(names):
+        raise ValueError("Input files must have distinct names when writing to an output directory")
+    
+    os.makedirs(output, exist_ok=True)
+    return [(input_file, os.path.join(output, name)) for input_file, name in zip(input_files, names)]
+
 def validate_file_paths(input_file: str, output_file: str = None):
     """Validate input and output file paths."""
     import os
@@ -192,25 +234,45 @@ Examples:
   # With custom redaction strategy
   python main.py --input data/voice_metadata.json --output data/redacted.json --strategy mask
   
+  # Tune the worker count on this host's first files (cached for later runs)
+  python main.py --input data/day1.json data/day2.json --output data/redacted --workers auto
+  
+  # Several files, two at a time, written to data/redacted/
+  python main.py --input data/day1.json data/day2.json data/day3.json --output data/redacted --file-workers 2
+  
   # Test mode with sample data
   python main.py --test
         """
     )
     
     # Input/Output arguments
-    parser.add_argument('--input', '-i', help='Input JSON file path')
-    parser.add_argument('--output', '-o', help='Output JSON file path (optional)')
+    parser.add_argument('--input', '-i', nargs='+',
+                       help='Input JSON file path(s)')
+    parser.add_argument('--output', '-o',
+                       help='Output JSON file path, or output directory for several inputs (optional)')
     
     # Detection configuration
     parser.add_argument('--use-comprehend', action='store_true',
                        help='Use AWS Comprehend for PII detection')
     parser.add_argument('--cer-endpoint', 
                        help='Custom Entity Recognizer endpoint ARN')
+    parser.add_argument('--pack-comprehend-batches', action='store_true',
+                       help='Join up to 25 texts per Comprehend request: fewer calls, but '
+                            'neighbouring texts can change what is detected')
+    parser.add_argument('--workers', type=parse_workers, default=os.cpu_count() or 1,
+                       help="Concurrent payload batch workers, or 'auto' to time candidate "
+                            "counts on the first of several inputs and cache the fastest; "
+                            "a single input uses the cached count (default: CPU count)")
+    parser.add_argument('--file-workers', type=parse_positive_int, default=1,
+                       help='Input files processed in parallel worker processes; each gets '
+                            'at most CPU count / file workers payload workers (default: 1)')
     
     # Redaction configuration
     parser.add_argument('--strategy', default='placeholder',
                        choices=['placeholder', 'mask', 'partial', 'remove', 'hash'],
                        help='Redaction strategy (default: placeholder)')
+    parser.add_argument('--metadata-sidecar', action='store_true',
+                       help='Write redaction metadata to <output>.meta.jsonl instead of into each payload')
     
     # Utility arguments
     parser.add_argument('--test', action='store_true',
@@ -237,42 +299,49 @@ Examples:
             parser.error("--input is required (or use --test for test mode)")
         
         # Validate file paths
-        output_file = None if args.dry_run else args.output
-        validate_file_paths(args.input, output_file)
+        file_pairs = create_file_pairs(args.input, None if args.dry_run else args.output)
+        for input_file, output_file in file_pairs:
+            validate_file_paths(input_file, output_file)
         
         # Create configurations
         detection_config, redaction_config = create_config_from_args(args)
         
         # Initialize orchestrator
         logger.info("🚀 Initializing PII Redaction System...")
-        orchestrator = BatchOrchestrator(detection_config, redaction_config)
+        orchestrator = BatchOrchestrator(detection_config, redaction_config,
+                                         file_workers=args.file_workers)
         
         # Log configuration
-        logger.info(f"📁 Input file: {args.input}")
-        logger.info(f"📁 Output file: {output_file or 'None (dry run)'}")
-        logger.info(f"🔍 Detection: {'Comprehend + Regex' if args.use_comprehend else 'Regex only'}")
-        logger.info(f"🔧 Redaction strategy: {args.strategy}")
+        for input_file, output_file in file_pairs:
+            logger.info("📁 Input file: %s", input_file)
+            logger.info("📁 Output file: %s", output_file or 'None (dry run)')
+        logger.info("🔍 Detection: %s", 'Comprehend + Regex' if args.use_comprehend else 'Regex only')
+        logger.info("🔧 Redaction strategy: %s", args.strategy)
         
-        # Process file
+        # Process files
         logger.info("⚡ Starting file processing...")
         start_time = time.time()
         
-        result = orchestrator.process_file(args.input, output_file)
+        if len(file_pairs) == 1:
+            results = [orchestrator.process_file(*file_pairs[0])]
+        else:
+            results = orchestrator.process_multiple_files(file_pairs)
         
         total_time = time.time() - start_time
-        logger.info(f"🏁 Processing completed in {total_time:.2f} seconds")
+        logger.info("🏁 Processing completed in %.2f seconds", total_time)
         
         # Display results
-        print_job_summary(result)
+        for result in results:
+            print_job_summary(result)
         
         # Return appropriate exit code
-        return 0 if result.status == 'success' else 1
+        return 0 if all(result.status == 'success' for result in results) else 1
         
     except KeyboardInterrupt:
         print("\n❌ Processing interrupted by user")
         return 130
     except Exception as e:
-        logger.error(f"❌ Fatal error: {str(e)}")
+        logger.error("❌ Fatal error: %s", e)
         if args.verbose:
             import traceback
             traceback.print_exc()
@@ -0,0 +1,11 @@
+"""
+Batch Processing
+Runs detection and redaction over payloads, files and whole batch jobs.
+"""
+
+from .job_result import JobResult, PayloadStats
+from .payload_processor import PayloadProcessor
+from .file_processor import FileProcessor
+from .batch_orchestrator import BatchOrchestrator
+
+__all__ = ['BatchOrchestrator', 'FileProcessor', 'PayloadProcessor', 'JobResult', 'PayloadStats']
\ No newline at end of file
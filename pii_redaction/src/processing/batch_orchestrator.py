@@ -7,66 +7,126 @@ This is the entry point for batch job execution.
 
 import logging
 import argparse
+import json
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 # Import all processing components
-from detection import PIIDetector
-from redaction import TextRedactor
-from payload_processor import PayloadProcessor
-from file_processor import FileProcessor
-from job_result import JobResult
+from ..detection import PIIDetector
+from ..redaction import TextRedactor
+from .payload_processor import PayloadProcessor
+from .file_processor import FileProcessor
+from .job_result import JobResult
 
 logger = logging.getLogger(__name__)
 
+# Best worker counts found by probing, reused by later runs on the same host
+TUNING_CACHE_PATH = os.path.join(
+    os.environ.get('PII_REDACTION_CACHE_DIR',
+                   os.path.join(os.path.expanduser('~'), '.cache', 'pii_redaction')),
+    'tuning.json'
+)
+
+# Payloads timed per candidate worker count when tuning; enough for every
+# worker to run several tasks, so the timing reflects steady-state throughput
+TUNING_SAMPLE_SIZE = 5000
+
+# Bumped whenever probing changes, so results from older probes are ignored
+TUNING_CACHE_VERSION = 3
+
+# Per-process orchestrator for file-level workers, built once by the pool initializer
+_FILE_WORKER_ORCHESTRATOR: Optional['BatchOrchestrator'] = None
+
+def _init_file_worker(detection_config: Dict[str, Any], redaction_config: Dict[str, Any]):
+    """Build the worker's orchestrator once, so its detector is reused across files."""
+    global _FILE_WORKER_ORCHESTRATOR
+    _FILE_WORKER_ORCHESTRATOR = BatchOrchestrator(detection_config, redaction_config)
+
+def _worker_process_file(file_pair: tuple) -> JobResult:
+    """Process one (input_file, output_file) pair with the worker's orchestrator."""
+    input_file, output_file = file_pair
+    return _FILE_WORKER_ORCHESTRATOR.process_file(input_file, output_file)
+
 class BatchOrchestrator:
     """Main orchestrator for PII redaction batch jobs."""
     
     def __init__(self, detection_config: Dict[str, Any] = None, 
-                 redaction_config: Dict[str, Any] = None):
+                 redaction_config: Dict[str, Any] = None, file_workers: int = 1):
         """
         Initialize batch orchestrator.
         
         Args:
             detection_config: Configuration for PII detection
             redaction_config: Configuration for PII redaction
+            file_workers: Worker processes for process_multiple_files (1 processes files in sequence)
         """
+        self.file_workers = file_workers
+        
         # Default configurations
         self.detection_config = detection_config or {
             'use_comprehend': False,
-            'cer_endpoint_arn': None
+            'cer_endpoint_arn': None,
+            'batch_size': 25
         }
         
         self.redaction_config = redaction_config or {
             'strategy': 'placeholder'
         }
         
+        # Worker count is tuned on the host only when set to 'auto'
+        max_workers = self.detection_config.get('max_workers') or 1
+        self._auto_workers = max_workers == 'auto'
+        self._workers_tuned = False
+        
         # Initialize components
         self.detector = self._create_detector()
         self.redactor = self._create_redactor()
-        self.payload_processor = PayloadProcessor(self.detector, self.redactor)
-        self.file_processor = FileProcessor(self.payload_processor)
+        self.payload_processor = PayloadProcessor(
+            self.detector, self.redactor,
+            batch_size=self.detection_config.get('batch_size', 25),
+            max_workers=1 if self._auto_workers else max_workers,
+            chunksize=self.detection_config.get('chunksize')
+        )
+        self.file_processor = FileProcessor(
+            self.payload_processor,
+            metadata_sidecar=self.redaction_config.get('metadata_sidecar', False)
+        )
+        
+        # Probed once here rather than per file; with Comprehend each probe is a network call
+        self._validation_ok = self._validate_setup()
         
         logger.info("BatchOrchestrator initialized successfully")
     
-    def process_file(self, input_file: str, output_file: str = None) -> JobResult:
+    def process_file(self, input_file: str, output_file: str = None,
+                     revalidate: bool = False) -> JobResult:
         """
         Process a single voice metadata file.
         
         Args:
             input_file: Path to input JSON file
             output_file: Path to output file (optional)
+            revalidate: Re-run the setup validation instead of using the result from construction
             
         Returns:
             JobResult with processing results
         """
-        logger.info(f"Starting batch job for file: {input_file}")
+        logger.info("Starting batch job for file: %s", input_file)
         
         # Validate setup
-        if not self._validate_setup():
+        if revalidate:
+            self._validation_ok = self._validate_setup()
+        
+        if not self._validation_ok:
             return JobResult.create_failed(input_file, "Setup validation failed")
         
+        # A lone file is not worth probing; it uses the count cached by an earlier run
+        if self._auto_workers and not self._workers_tuned:
+            self._tune_workers([])
+        
         # Process the file
         result = self.file_processor.process_file(input_file, output_file)
         
@@ -77,7 +137,7 @@ class BatchOrchestrator:
     
     def process_multiple_files(self, file_pairs: list) -> list:
         """
-        Process multiple files in sequence.
+        Process multiple files, in parallel worker processes when file_workers > 1.
         
         Args:
             file_pairs: List of (input_file, output_file) tuples
@@ -87,22 +147,139 @@ class BatchOrchestrator:
         """
         results = []
         
-        logger.info(f"Starting batch processing for {len(file_pairs)} files")
+        logger.info("Starting batch processing for %s files", len(file_pairs))
         
-        for input_file, output_file in file_pairs:
-            result = self.process_file(input_file, output_file)
-            results.append(result)
+        # Probing once is amortized over the remaining files
+        if (self._auto_workers and not self._workers_tuned and len(file_pairs) >= 2
+                and self.file_workers <= 1):
+            self._tune_workers([input_file for input_file, _ in file_pairs])
+        
+        if self.file_workers > 1 and len(file_pairs) > 1:
+            results = self._process_files_in_pool(file_pairs)
+        else:
+            for input_file, output_file in file_pairs:
+                result = self.process_file(input_file, output_file)
+                results.append(result)
         
         # Log overall results
         self._log_batch_results(results)
         
         return results
     
+    def _process_files_in_pool(self, file_pairs: list) -> list:
+        """Process files across worker processes, returning results in input order."""
+        file_workers = min(self.file_workers, len(file_pairs))
+        
+        # Split the CPUs between the two levels so files x payload workers stays
+        # within the cores, whether payload workers are tuned or set explicitly
+        detection_config = dict(self.detection_config)
+        payload_workers = max(1, (os.cpu_count() or 1) // file_workers)
+        if not self._auto_workers:
+            payload_workers = min(self.payload_processor.max_workers, payload_workers)
+        detection_config['max_workers'] = payload_workers
+        
+        logger.info("Processing %s files across %s worker processes, %s payload workers each",
+                    len(file_pairs), file_workers, payload_workers)
+        
+        with ProcessPoolExecutor(
+            max_workers=file_workers,
+            initializer=_init_file_worker,
+            initargs=(detection_config, self.redaction_config)
+        ) as executor:
+            return list(executor.map(_worker_process_file, file_pairs))
+    
+    def _tune_workers(self, input_files: list):
+        """
+        Pick the payload worker count for this host, probing on a sample if not cached.
+        
+        The sample is the first TUNING_SAMPLE_SIZE payloads across input_files.
+        Without a cached count or enough payloads to time, every CPU is used
+        and nothing is cached.
+        
+        Args:
+            input_files: Input files whose first payloads are timed
+        """
+        payload_processor = self.payload_processor
+        cpu_count = os.cpu_count() or 1
+        self._workers_tuned = True
+        payload_processor.max_workers = cpu_count
+        
+        # AWS-bound runs are not probed: timing them makes billed calls, and
+        # their threads mostly wait on the network
+        if self.detector.use_comprehend or self.detector.cer_endpoint_arn:
+            return
+        
+        cache_key = (f"v{TUNING_CACHE_VERSION}:{cpu_count}:{payload_processor.batch_size}:"
+                     f"{payload_processor.chunksize}:{self.redactor.strategy_name}")
+        tuning = self._load_tuning_cache()
+        if isinstance(tuning.get(cache_key), int):
+            payload_processor.max_workers = tuning[cache_key]
+            logger.info("Using cached worker count: %s", tuning[cache_key])
+            return
+        
+        if not input_files:
+            return
+        
+        try:
+            payloads = chain.from_iterable(
+                self.file_processor.iter_payloads(input_file) for input_file in input_files
+            )
+            sample = list(islice(payloads, TUNING_SAMPLE_SIZE))
+        except Exception as e:
+            logger.warning("⚠️  Worker tuning skipped, could not read input: %s", e)
+            return
+        
+        # Timings of a short sample are dominated by overheads and say nothing about large inputs
+        if len(sample) < TUNING_SAMPLE_SIZE:
+            logger.info("Worker tuning skipped: %s payloads is too few to time", len(sample))
+            return
+        
+        try:
+            best_workers, best_rate = 1, 0.0
+            for workers in sorted({1, 2, 4, 8, cpu_count}):
+                if workers > cpu_count:
+                    continue
+                rate = payload_processor.benchmark(sample, workers)
+                logger.debug("Worker tuning: %s workers, %.0f payloads/second", workers, rate)
+                if rate > best_rate:
+                    best_workers, best_rate = workers, rate
+        except Exception as e:
+            logger.warning("⚠️  Worker tuning failed, using %s workers: %s", cpu_count, e)
+            return
+        
+        payload_processor.max_workers = best_workers
+        logger.info("Tuned worker count: %s (%.0f payloads/second)", best_workers, best_rate)
+        
+        tuning[cache_key] = best_workers
+        self._save_tuning_cache(tuning)
+    
+    def _load_tuning_cache(self) -> Dict[str, int]:
+        """Load cached worker counts, or an empty dict if there are none."""
+        try:
+            with open(TUNING_CACHE_PATH, 'r', encoding='utf-8') as f:
+                tuning = json.load(f)
+            return tuning if isinstance(tuning, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_tuning_cache(self, tuning: Dict[str, int]):
+        """Save cached worker counts, replacing the file atomically."""
+        try:
+            os.makedirs(os.path.dirname(TUNING_CACHE_PATH), exist_ok=True)
+            temp_path = f"{TUNING_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(tuning, f, indent=2)
+            os.replace(temp_path, TUNING_CACHE_PATH)
+        except OSError as e:
+            logger.debug("Could not write tuning cache %s: %s", TUNING_CACHE_PATH, e)
+    
     def _create_detector(self) -> PIIDetector:
         """Create and configure PII detector."""
         return PIIDetector(
             use_comprehend=self.detection_config.get('use_comprehend', False),
-            cer_endpoint_arn=self.detection_config.get('cer_endpoint_arn')
+            cer_endpoint_arn=self.detection_config.get('cer_endpoint_arn'),
+            comprehend_skip_coverage=self.detection_config.get('comprehend_skip_coverage'),
+            pack_comprehend_batches=self.detection_config.get('pack_comprehend_batches', False)
         )
     
     def _create_redactor(self) -> TextRedactor:
@@ -125,37 +302,43 @@ class BatchOrchestrator:
             return True
             
         except Exception as e:
-            logger.error(f"❌ Setup validation failed: {str(e)}")
+            logger.error("❌ Setup validation failed: %s", e)
             return False
     
     def _log_job_results(self, result: JobResult):
         """Log the results of a job."""
         if result.status == 'success':
-            logger.info(f"✅ Job completed successfully:")
-            logger.info(f"   Processed: {result.processed_payloads} payloads")
-            logger.info(f"   PII detected: {result.total_pii_detected}")
-            logger.info(f"   PII redacted: {result.total_pii_redacted}")
-            logger.info(f"   Processing time: {result.processing_time_seconds:.2f}s")
+            logger.info("✅ Job completed successfully:")
+            logger.info("   Processed: %s payloads", result.processed_payloads)
+            logger.info("   PII detected: %s", result.total_pii_detected)
+            logger.info("   PII redacted: %s", result.total_pii_redacted)
+            logger.info("   Processing time: %.2fs", result.processing_time_seconds)
         else:
-            logger.error(f"❌ Job failed:")
-            logger.error(f"   File: {result.source_file}")
-            logger.error(f"   Errors: {result.errors}")
+            logger.error("❌ Job failed:")
+            logger.error("   File: %s", result.source_file)
+            logger.error("   Errors: %s", result.errors)
     
     def _log_batch_results(self, results: list):
         """Log the results of batch processing."""
-        successful = [r for r in results if r.status == 'success']
-        failed = [r for r in results if r.status == 'failed']
+        successful = failed = 0
+        total_payloads = total_pii = 0
         
-        total_payloads = sum(r.processed_payloads for r in successful)
-        total_pii = sum(r.total_pii_detected for r in successful)
+        # One pass over the results, accumulating every counter
+        for r in results:
+            if r.status == 'success':
+                successful += 1
+                total_payloads += r.processed_payloads
+                total_pii += r.total_pii_detected
+            elif r.status == 'failed':
+                failed += 1
         
-        logger.info(f"📊 Batch processing summary:")
-        logger.info(f"   Files processed: {len(successful)}/{len(results)}")
-        logger.info(f"   Total payloads: {total_payloads}")
-        logger.info(f"   Total PII detected: {total_pii}")
+        logger.info("📊 Batch processing summary:")
+        logger.info("   Files processed: %s/%s", successful, len(results))
+        logger.info("   Total payloads: %s", total_payloads)
+        logger.info("   Total PII detected: %s", total_pii)
         
         if failed:
-            logger.warning(f"   Failed files: {len(failed)}")
+            logger.warning("   Failed files: %s", failed)
     
     def get_orchestrator_info(self) -> Dict[str, Any]:
         """Get information about the orchestrator configuration."""
@@ -203,10 +386,10 @@ def main():
     
     # Log configuration
     logger.info("🚀 Starting PII Redaction Batch Job")
-    logger.info(f"   Input file: {args.input}")
-    logger.info(f"   Output file: {args.output or 'None (dry run)'}")
-    logger.info(f"   Detection: {'Comprehend + Regex' if args.use_comprehend else 'Regex only'}")
-    logger.info(f"   Redaction strategy: {args.strategy}")
+    logger.info("   Input file: %s", args.input)
+    logger.info("   Output file: %s", args.output or 'None (dry run)')
+    logger.info("   Detection: %s", 'Comprehend + Regex' if args.use_comprehend else 'Regex only')
+    logger.info("   Redaction strategy: %s", args.strategy)
     
     # Process file
     start_time = time.time()
@@ -214,7 +397,7 @@ def main():
     total_time = time.time() - start_time
     
     # Final summary
-    logger.info(f"🏁 Batch job completed in {total_time:.2f} seconds")
+    logger.info("🏁 Batch job completed in %.2f seconds", total_time)
     print(f"\nJob Summary: {result.get_summary()}")
     
     # Exit with appropriate code
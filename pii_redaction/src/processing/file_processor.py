@@ -7,26 +7,128 @@ Manages file I/O and coordinates payload processing.
 
 import json
 import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime
 
-from payload_processor import PayloadProcessor
-from job_result import JobResult
+from .payload_processor import PayloadProcessor
+from .job_result import JobResult, PayloadStats
+
+# orjson parses and encodes in C; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Large file buffers turn many small reads/writes into few syscalls
+IO_BUFFER_SIZE = 1 << 20
+
+# Linux ioctl that clones a file's extents copy-on-write (btrfs, XFS)
+_FICLONE = 0x40049409
+
+# Payloads buffered between pipeline stages; bounds memory when a stage falls behind
+PIPELINE_QUEUE_SIZE = 1000
+
+# Stage markers: end of stream, and processing failed (discard output)
+_END = object()
+_ABORT = object()
+
+# Permissions for new output files, as open() would create them; read once,
+# since os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _open_temp_beside(file_path: str):
+    """
+    Open a uniquely named temporary file in file_path's directory for binary writing.
+    
+    It takes the mode and, where permitted, the owner of an existing file_path,
+    so replacing file_path with it keeps them. Unique names keep concurrent
+    jobs writing the same output from overwriting each other's temporary file.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or '.',
+                                     prefix=f".{os.path.basename(file_path)}.", suffix='.tmp')
+    try:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+        else:
+            os.chmod(temp_path, stat.st_mode & 0o7777)
+            try:
+                os.chown(temp_path, stat.st_uid, stat.st_gid)
+            except OSError:
+                pass  # Only root can give files away; the mode is still kept
+        return os.fdopen(fd, 'wb', buffering=IO_BUFFER_SIZE), temp_path
+    except BaseException:
+        os.close(fd)
+        os.remove(temp_path)
+        raise
+
+def _dumps_indented(item: Any) -> bytes:
+    """Encode item like json.dumps(item, indent=2, ensure_ascii=False), as UTF-8."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(item, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers wider than 64 bits, which json can encode
+    return json.dumps(item, indent=2, ensure_ascii=False).encode('utf-8')
+
+class _JSONArrayWriter:
+    """
+    Streams a JSON array to disk one element at a time.
+    
+    Output matches json.dump(items, f, indent=2, ensure_ascii=False), apart
+    from orjson's shorter float exponents (1e16 rather than 1e+16). Elements
+    go to a temporary file that replaces the destination only on commit(), so
+    a failed job never leaves a partial file or truncates an in-place input.
+    The destination keeps its mode, as it did when written in place.
+    """
+    
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file, self.temp_path = _open_temp_beside(file_path)
+        self._count = 0
+    
+    def write(self, item: Any):
+        """Append one element to the array."""
+        encoded = _dumps_indented(item)
+        # Nest the element one level inside the array; encoded strings never contain raw newlines
+        self._file.write((b'[\n  ' if self._count == 0 else b',\n  ') + encoded.replace(b'\n', b'\n  '))
+        self._count += 1
+    
+    def commit(self):
+        """Close the array and move the file into place."""
+        self._file.write(b'\n]' if self._count else b'[]')
+        self._file.close()
+        os.replace(self.temp_path, self.file_path)
+    
+    def discard(self):
+        """Close and delete the partial file."""
+        self._file.close()
+        os.remove(self.temp_path)
+
 class FileProcessor:
     """Processes complete voice metadata JSON files."""
     
-    def __init__(self, payload_processor: PayloadProcessor):
+    def __init__(self, payload_processor: PayloadProcessor, metadata_sidecar: bool = False):
         """
         Initialize file processor.
         
         Args:
             payload_processor: PayloadProcessor instance for individual payloads
+            metadata_sidecar: Write redaction metadata to <output>.meta.jsonl instead
+                of embedding _redaction_metadata in each payload
         """
         self.payload_processor = payload_processor
+        self.metadata_sidecar = metadata_sidecar
     
     def process_file(self, input_file_path: str, output_file_path: Optional[str] = None) -> JobResult:
         """
@@ -42,34 +144,24 @@ class FileProcessor:
         start_time = time.time()
         
         try:
-            # Step 1: Load the input file
-            logger.info(f"Loading file: {input_file_path}")
-            payloads = self._load_json_file(input_file_path)
+            # Steps 1-3 run as a pipeline: a reader thread parses payloads, this
+            # thread detects and redacts them, and a writer thread saves output
+            logger.info("Loading file: %s", input_file_path)
+            stats_list = self._run_pipeline(input_file_path, output_file_path)
             
-            if not payloads:
+            if not stats_list:
                 return JobResult.create_failed(input_file_path, "No payloads found in file")
             
-            logger.info(f"Loaded {len(payloads)} payloads")
-            
-            # Step 2: Process all payloads
-            logger.info("Processing payloads for PII detection and redaction...")
-            redacted_payloads, stats_list = self.payload_processor.process_multiple_payloads(payloads)
-            
-            # Step 3: Calculate processing statistics
+            # Step 4: Calculate processing statistics
             processing_stats = self._calculate_processing_stats(stats_list)
             
-            # Step 4: Save the output file (if path provided)
-            if output_file_path:
-                logger.info(f"Saving redacted file: {output_file_path}")
-                self._save_json_file(redacted_payloads, output_file_path)
-            
             # Step 5: Create job result
             processing_time = time.time() - start_time
             
             job_result = JobResult.create_success(
                 source_file=input_file_path,
                 dest_file=output_file_path,
-                total_payloads=len(payloads),
+                total_payloads=len(stats_list),
                 total_pii=processing_stats['total_pii_detected'],
                 redacted_pii=processing_stats['total_pii_redacted'],
                 payloads_with_pii=processing_stats['payloads_with_pii'],
@@ -82,22 +174,212 @@ class FileProcessor:
             if processing_stats['failed_payloads'] > 0:
                 job_result.warnings.append(f"{processing_stats['failed_payloads']} payloads failed to process")
             
-            logger.info(f"File processing completed successfully in {processing_time:.2f} seconds")
+            logger.info("File processing completed successfully in %.2f seconds", processing_time)
             return job_result
             
         except Exception as e:
             processing_time = time.time() - start_time
-            logger.error(f"File processing failed after {processing_time:.2f} seconds: {str(e)}")
+            logger.error("File processing failed after %.2f seconds: %s", processing_time, e)
             return JobResult.create_failed(input_file_path, str(e))
     
+    def _run_pipeline(self, input_file_path: str, output_file_path: Optional[str]) -> List[PayloadStats]:
+        """
+        Read, process and write payloads as concurrent stages joined by bounded queues.
+        
+        Args:
+            input_file_path: Path to input JSON file
+            output_file_path: Path to output file (optional)
+            
+        Returns:
+            Processing statistics for each payload, in file order
+        """
+        stop = threading.Event()
+        in_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        out_q = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        write_errors = []
+        
+        reader = threading.Thread(
+            target=self._read_stage, args=(input_file_path, in_q, stop),
+            name='file-reader', daemon=True
+        )
+        writer = threading.Thread(
+            target=self._write_stage, args=(out_q, output_file_path, write_errors),
+            name='file-writer', daemon=True
+        )
+        reader.start()
+        writer.start()
+        
+        stats_list = []
+        end_marker = _ABORT
+        metadata_sidecar = None
+        try:
+            if self.metadata_sidecar and output_file_path:
+                metadata_sidecar = self._open_metadata_sidecar(output_file_path)
+            
+            logger.info("Processing payloads for PII detection and redaction...")
+            payloads = self._drain(in_q)
+            for redacted_payload, stats in self.payload_processor.iter_process_payloads(payloads):
+                out_q.put(redacted_payload)
+                stats_list.append(stats)
+            
+            # An empty file is a failed job, so nothing is written for it
+            if stats_list:
+                end_marker = _END
+        finally:
+            stop.set()
+            out_q.put(end_marker)
+            writer.join()
+            
+            if metadata_sidecar is not None:
+                self._close_metadata_sidecar(
+                    metadata_sidecar, output_file_path, end_marker is _END and not write_errors
+                )
+        
+        if write_errors:
+            raise write_errors[0]
+        
+        logger.info("Processed %s payloads", len(stats_list))
+        return stats_list
+    
+    def _open_metadata_sidecar(self, output_file_path: str) -> tuple:
+        """Start the metadata sidecar beside the output and route redaction metadata to it."""
+        metadata_file, temp_path = _open_temp_beside(f"{output_file_path}.meta.jsonl")
+        self.payload_processor.metadata_writer = metadata_file
+        return metadata_file, temp_path
+    
+    def _close_metadata_sidecar(self, metadata_sidecar: tuple, output_file_path: str, succeeded: bool):
+        """Detach the sidecar; like the output, it replaces the old file only on success."""
+        metadata_file, temp_path = metadata_sidecar
+        self.payload_processor.metadata_writer = None
+        metadata_file.close()
+        
+        if succeeded:
+            os.replace(temp_path, f"{output_file_path}.meta.jsonl")
+        else:
+            os.remove(temp_path)
+    
+    def _read_stage(self, file_path: str, in_q: queue.Queue, stop: threading.Event):
+        """Reader stage: parse payloads into in_q, then _END or the parse error."""
+        try:
+            for payload in self.iter_payloads(file_path):
+                if not self._put(in_q, payload, stop):
+                    return
+            item = _END
+        except Exception as e:
+            item = e
+        
+        self._put(in_q, item, stop)
+    
+    def _write_stage(self, out_q: queue.Queue, output_file_path: Optional[str], errors: list):
+        """Writer stage: stream redacted payloads from out_q into the output file."""
+        writer = None
+        
+        # Always drain to the end marker so the processing stage never blocks
+        while True:
+            item = out_q.get()
+            if item is _END or item is _ABORT:
+                break
+            if not output_file_path or errors:
+                continue
+            
+            try:
+                if writer is None:
+                    logger.info("Saving redacted file: %s", output_file_path)
+                    writer = _JSONArrayWriter(output_file_path)
+                writer.write(item)
+            except Exception as e:
+                errors.append(ValueError(f"Error writing file: {str(e)}"))
+        
+        if writer is None:
+            return
+        
+        # Only a complete, successful job replaces the output file
+        try:
+            if item is _END and not errors:
+                writer.commit()
+            else:
+                writer.discard()
+        except Exception as e:
+            errors.append(ValueError(f"Error writing file: {str(e)}"))
+    
+    @staticmethod
+    def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Put item on q, giving up once the pipeline stops; returns False if stopped."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    @staticmethod
+    def _drain(in_q: queue.Queue) -> Iterator[Dict[str, Any]]:
+        """Yield payloads from in_q until the reader ends, re-raising reader errors."""
+        while True:
+            item = in_q.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    
+    def iter_payloads(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream payloads from a JSON file.
+        
+        Top-level arrays are parsed incrementally with ijson when it is
+        installed, so detection starts before the whole file is parsed.
+        Single-object files and environments without ijson load the whole file.
+        
+        Args:
+            file_path: Path to input JSON file
+            
+        Yields:
+            Payload dicts in file order
+        """
+        try:
+            import ijson
+        except ImportError:
+            logger.debug("ijson not installed, loading whole file")
+            yield from self._load_json_file(file_path)
+            return
+        
+        if not self._starts_with_array(file_path):
+            yield from self._load_json_file(file_path)
+            return
+        
+        try:
+            with open(file_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+                # use_float keeps numbers as floats; Decimals are not JSON serializable
+                yield from ijson.items(f, 'item', use_float=True, buf_size=IO_BUFFER_SIZE)
+        except ijson.JSONError as e:
+            raise ValueError(f"Invalid JSON format: {str(e)}")
+        except FileNotFoundError:
+            raise ValueError(f"File not found: {file_path}")
+    
+    def _starts_with_array(self, file_path: str) -> bool:
+        """Check whether a JSON file's top-level value is an array."""
+        try:
+            with open(file_path, 'rb') as f:
+                while True:
+                    chunk = f.read(4096)
+                    if not chunk:
+                        return False
+                    chunk = chunk.lstrip()
+                    if chunk:
+                        return chunk[:1] == b'['
+        except FileNotFoundError:
+            raise ValueError(f"File not found: {file_path}")
+    
     def _load_json_file(self, file_path: str) -> List[Dict[str, Any]]:
         """Load and parse JSON file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(file_path, 'rb') as f:
                 content = f.read()
             
             # Handle different JSON formats
-            data = json.loads(content)
+            data = orjson.loads(content) if orjson is not None else json.loads(content)
             
             # Convert single payload to list
             if isinstance(data, dict):
@@ -108,25 +390,24 @@ class FileProcessor:
                 raise ValueError(f"Unexpected JSON format: {type(data)}")
                 
         except json.JSONDecodeError as e:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
             raise ValueError(f"Invalid JSON format: {str(e)}")
         except FileNotFoundError:
             raise ValueError(f"File not found: {file_path}")
         except Exception as e:
             raise ValueError(f"Error reading file: {str(e)}")
     
-    def _save_json_file(self, data: List[Dict[str, Any]], file_path: str):
-        """Save data as JSON file."""
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            raise ValueError(f"Error writing file: {str(e)}")
-    
-    def _calculate_processing_stats(self, stats_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_processing_stats(self, stats_list: List[PayloadStats]) -> Dict[str, Any]:
         """Calculate overall processing statistics."""
-        total_pii_detected = sum(stats.get('pii_detected', 0) for stats in stats_list)
-        failed_payloads = sum(1 for stats in stats_list if stats.get('status') == 'failed')
-        payloads_with_pii = sum(1 for stats in stats_list if stats.get('pii_detected', 0) > 0)
+        total_pii_detected = failed_payloads = payloads_with_pii = 0
+        
+        # One pass over the stats, accumulating every counter
+        for stats in stats_list:
+            total_pii_detected += stats.pii_detected
+            if stats.status == 'failed':
+                failed_payloads += 1
+            if stats.pii_detected > 0:
+                payloads_with_pii += 1
         
         return {
             'total_pii_detected': total_pii_detected,
@@ -140,21 +421,70 @@ class FileProcessor:
         backup_path = f"{file_path}.backup"
         
         # Create backup
-        import shutil
-        shutil.copy2(file_path, backup_path)
+        self._create_backup(file_path, backup_path)
         
         try:
             result = self.process_file(file_path, file_path)
             if result.status == 'success':
                 # Remove backup on success
-                import os
                 os.remove(backup_path)
             return result
         except Exception as e:
-            # Restore backup on failure
-            shutil.move(backup_path, file_path)
+            # Restore backup on failure; a hardlink backup of an untouched file
+            # is the same inode, which rename would silently leave in place
+            if os.path.exists(file_path) and os.path.samefile(backup_path, file_path):
+                os.remove(backup_path)
+            else:
+                shutil.move(backup_path, file_path)
             raise
 
+    def _create_backup(self, file_path: str, backup_path: str):
+        """
+        Back up a file without copying its data where the filesystem allows.
+        
+        A hardlink is safe because output replaces the file with a new inode
+        (see _JSONArrayWriter), leaving the backup's inode untouched. Falls
+        back to a copy-on-write clone, then to a full copy.
+        
+        Args:
+            file_path: File to back up
+            backup_path: Path of the backup
+        """
+        # Built aside and moved over any previous backup, so that backup
+        # survives if every method fails. Links and clones do not overwrite,
+        # so a temporary file left by a crashed run is removed first.
+        temp_path = f"{backup_path}.{os.getpid()}.tmp"
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        
+        try:
+            self._link_or_copy(file_path, temp_path)
+            os.replace(temp_path, backup_path)
+        finally:
+            # Also left behind when the old backup was already a link to the same file,
+            # since renaming one link of a file over another does nothing
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+    
+    def _link_or_copy(self, file_path: str, copy_path: str):
+        """Hardlink file_path to the new path copy_path, or clone or copy it there."""
+        try:
+            os.link(file_path, copy_path)
+            return
+        except OSError as e:
+            logger.debug("Hardlink backup failed (%s), trying a reflink clone", e)
+        
+        try:
+            import fcntl
+            with open(file_path, 'rb') as src, open(copy_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            shutil.copystat(file_path, copy_path)
+            return
+        except (ImportError, OSError) as e:
+            logger.debug("Reflink backup failed (%s), copying", e)
+        
+        shutil.copy2(file_path, copy_path)
+
 def test_file_processor():
     """Test the file processor with sample data."""
     
@@ -187,8 +517,8 @@ def test_file_processor():
     print("🔄 Testing File Processor...")
     
     # Initialize components
-    from detection import PIIDetector
-    from redaction import TextRedactor
+    from ..detection import PIIDetector
+    from ..redaction import TextRedactor
     
     detector = PIIDetector(use_comprehend=False)
     redactor = TextRedactor('placeholder')
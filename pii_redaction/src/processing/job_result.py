@@ -8,7 +8,17 @@ from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
+class PayloadStats:
+    """Processing statistics for a single payload."""
+    
+    payload_id: Any
+    pii_detected: int
+    fields_with_pii: List[str]
+    status: str  # 'success', 'failed'
+    error: Optional[str] = None
+
+@dataclass(slots=True)
 class JobResult:
     """Result of processing a voice metadata file."""
     
@@ -46,6 +56,7 @@ class JobResult:
                       payloads_with_pii: int, processing_time: float,
                       detection_config: Dict[str, Any], redaction_config: Dict[str, Any]) -> 'JobResult':
         """Create a successful job result."""
+        now = datetime.utcnow().isoformat()
         return cls(
             source_file=source_file,
             dest_file=dest_file,
@@ -55,8 +66,8 @@ class JobResult:
             total_pii_detected=total_pii,
             total_pii_redacted=redacted_pii,
             payloads_with_pii=payloads_with_pii,
-            processing_start=datetime.utcnow().isoformat(),
-            processing_end=datetime.utcnow().isoformat(),
+            processing_start=now,
+            processing_end=now,
             processing_time_seconds=processing_time,
             detection_config=detection_config,
             redaction_config=redaction_config,
@@ -68,6 +79,7 @@ class JobResult:
     @classmethod
     def create_failed(cls, source_file: str, error_message: str) -> 'JobResult':
         """Create a failed job result."""
+        now = datetime.utcnow().isoformat()
         return cls(
             source_file=source_file,
             dest_file=None,
@@ -77,8 +89,8 @@ class JobResult:
             total_pii_detected=0,
             total_pii_redacted=0,
             payloads_with_pii=0,
-            processing_start=datetime.utcnow().isoformat(),
-            processing_end=datetime.utcnow().isoformat(),
+            processing_start=now,
+            processing_end=now,
             processing_time_seconds=0.0,
             detection_config={},
             redaction_config={},
@@ -5,37 +5,115 @@ Handles processing of individual voice metadata payloads.
 Coordinates detection and redaction for single payloads.
 """
 
+import io
+import json
 import logging
-from typing import Dict, List, Any, Tuple
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain, islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Any, Optional, Tuple
 
 # Import detection and redaction modules
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from detection import PIIDetector, PIIEntity
-from redaction import TextRedactor, RedactionResult
+from ..detection import PIIDetector, PIIEntity
+from ..redaction import TextRedactor, RedactionResult
+from .job_result import PayloadStats
 
 logger = logging.getLogger(__name__)
 
+# Default batches sent to a worker process per task
+DEFAULT_POOL_CHUNKSIZE = 4
+
+# Tasks kept in flight per worker; more only buffers input ahead of the output
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+# Per-process PayloadProcessor, built once by the pool initializer
+_WORKER_PROCESSOR: Optional['PayloadProcessor'] = None
+
+def _init_worker(detection_config: Dict[str, Any], strategy_name: str, batch_size: int,
+                 metadata_sidecar: bool = False):
+    """Build the worker's detector and redactor once, so compiled patterns are reused."""
+    global _WORKER_PROCESSOR
+    _WORKER_PROCESSOR = PayloadProcessor(
+        PIIDetector(**detection_config), TextRedactor(strategy_name), batch_size,
+        # Workers cannot share the parent's file; records are buffered and sent back
+        metadata_writer=io.BytesIO() if metadata_sidecar else None
+    )
+
+def _process_batches_in_worker(batches: List[List[Dict[str, Any]]]) -> Tuple[List[List[Tuple[Dict[str, Any], PayloadStats]]], bytes]:
+    """Process a chunk of payload batches with the worker's PayloadProcessor, plus their sidecar records."""
+    results = [_WORKER_PROCESSOR._process_payload_batch(batch) for batch in batches]
+    
+    metadata_writer = _WORKER_PROCESSOR.metadata_writer
+    if metadata_writer is None:
+        return results, b''
+    
+    metadata = metadata_writer.getvalue()
+    metadata_writer.seek(0)
+    metadata_writer.truncate()
+    return results, metadata
+
+def _map_bounded(executor: Executor, fn: Callable[[Any], Any], items: Iterable[Any],
+                 max_in_flight: int) -> Iterator[Any]:
+    """
+    Like Executor.map, but pull items from the input only as results are consumed.
+    
+    Executor.map submits every item up front, which reads a streamed input
+    file into memory before the first result comes back.
+    
+    Args:
+        executor: Executor running the tasks
+        fn: Function applied to each item
+        items: Items to process (any iterable, e.g. a streaming parser)
+        max_in_flight: Tasks submitted but not yet yielded
+        
+    Yields:
+        fn(item) for each item, in input order
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    
+    while pending:
+        yield pending.popleft().result()
+
 class PayloadProcessor:
     """Processes individual voice metadata payloads through detection and redaction."""
     
-    def __init__(self, detector: PIIDetector, redactor: TextRedactor):
+    def __init__(self, detector: PIIDetector, redactor: TextRedactor, batch_size: int = 25,
+                 max_workers: int = 1, chunksize: Optional[int] = None,
+                 metadata_writer: Optional[BinaryIO] = None):
         """
         Initialize payload processor.
         
         Args:
             detector: PIIDetector instance for PII detection
             redactor: TextRedactor instance for PII redaction
+            batch_size: Number of payloads whose texts are detected together
+            max_workers: Concurrent batch workers (1 processes in-line). Processes for
+                regex-only detection, threads when Comprehend or CER calls dominate
+            chunksize: Batches sent to a worker process per task (default: DEFAULT_POOL_CHUNKSIZE)
+            metadata_writer: Binary file receiving redaction metadata as JSON lines. When set,
+                payloads no longer carry _redaction_metadata
         """
         self.detector = detector
         self.redactor = redactor
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.chunksize = chunksize
+        self.metadata_writer = metadata_writer
         self.pii_fields = ['sentence', 'description', 'notes', 'comments', 'transcript']
         
-    def process_payload(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    def process_payload(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], PayloadStats]:
         """
         Process a single voice metadata payload.
         
+        Payloads without PII are returned as-is rather than copied, so
+        callers must not mutate the input and output payloads independently.
+        
         Args:
             payload: Voice metadata payload
             
@@ -43,56 +121,22 @@ class PayloadProcessor:
             Tuple of (redacted_payload, processing_stats)
         """
         try:
-            # Step 1: Detect PII in all relevant fields
-            entities_by_field = {}
-            total_entities = 0
-            
-            for field_name in self.pii_fields:
-                if self._should_process_field(payload, field_name):
-                    text = payload[field_name]
-                    entities = self.detector.detect_pii(text)
-                    
-                    if entities:
-                        entities_by_field[field_name] = entities
-                        total_entities += len(entities)
-                        logger.debug(f"Found {len(entities)} PII entities in field '{field_name}'")
-            
-            # Step 2: Redact PII from the payload
-            if entities_by_field:
-                redacted_payload = self._redact_payload_fields(payload, entities_by_field)
-            else:
-                redacted_payload = payload.copy()
+            # Step 1: Detect PII in all relevant fields with one detector call
+            field_refs, texts = self._collect_field_texts([payload])
+            entities_per_text = self.detector.detect_pii_batch(texts)
+            entities_by_field = self._scatter_entities(1, field_refs, entities_per_text)[0]
             
-            # Step 3: Create processing statistics
-            processing_stats = {
-                'payload_id': payload.get('verbatim_id', 'unknown'),
-                'pii_detected': total_entities,
-                'fields_with_pii': list(entities_by_field.keys()),
-                'status': 'success'
-            }
-            
-            return redacted_payload, processing_stats
+            return self._finish_payload(payload, entities_by_field)
             
         except Exception as e:
-            logger.error(f"Error processing payload {payload.get('verbatim_id', 'unknown')}: {str(e)}")
-            
-            # Return original payload and error stats
-            processing_stats = {
-                'payload_id': payload.get('verbatim_id', 'unknown'),
-                'pii_detected': 0,
-                'fields_with_pii': [],
-                'status': 'failed',
-                'error': str(e)
-            }
-            
-            return payload, processing_stats
+            return self._failed_payload(payload, e)
     
-    def process_multiple_payloads(self, payloads: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    def process_multiple_payloads(self, payloads: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[PayloadStats]]:
         """
         Process multiple payloads efficiently.
         
         Args:
-            payloads: List of voice metadata payloads
+            payloads: Voice metadata payloads (any iterable, e.g. a streaming parser)
             
         Returns:
             Tuple of (redacted_payloads, processing_stats_list)
@@ -100,38 +144,264 @@ class PayloadProcessor:
         redacted_payloads = []
         processing_stats_list = []
         
-        for payload in payloads:
-            redacted_payload, stats = self.process_payload(payload)
+        for redacted_payload, stats in self.iter_process_payloads(payloads):
             redacted_payloads.append(redacted_payload)
             processing_stats_list.append(stats)
         
-        logger.info(f"Processed {len(payloads)} payloads")
+        logger.info("Processed %s payloads", len(processing_stats_list))
         return redacted_payloads, processing_stats_list
     
+    def iter_process_payloads(self, payloads: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], PayloadStats]]:
+        """
+        Process payloads lazily, pulling one batch at a time from the input.
+        
+        Args:
+            payloads: Voice metadata payloads (any iterable, e.g. a streaming parser)
+            
+        Yields:
+            (redacted_payload, processing_stats) for each payload, in input order
+        """
+        # Detect in batches so Comprehend sees many texts per request
+        payloads = iter(payloads)
+        batches = iter(lambda: list(islice(payloads, self.batch_size)), [])
+        
+        # Peek at two batches: a single batch is not worth starting a pool
+        first_batches = list(islice(batches, 2))
+        batches = chain(first_batches, batches)
+        
+        if self.max_workers <= 1 or len(first_batches) <= 1:
+            batch_results = map(self._process_payload_batch, batches)
+        elif self._uses_aws_detection():
+            batch_results = self._process_batches_in_threads(batches)
+        else:
+            batch_results = self._process_batches_in_pool(batches)
+        
+        for results in batch_results:
+            yield from results
+    
+    def benchmark(self, payloads: List[Dict[str, Any]], max_workers: int) -> float:
+        """
+        Time processing payloads with a worker count, discarding the results.
+        
+        Worker processes are started and warmed up with one task each before
+        the clock starts, so process startup is not mistaken for throughput.
+        
+        Args:
+            payloads: Sample payloads
+            max_workers: Worker count to time (1 processes in-line)
+            
+        Returns:
+            Throughput in payloads per second
+        """
+        batches = [payloads[i:i + self.batch_size] for i in range(0, len(payloads), self.batch_size)]
+        
+        if max_workers <= 1:
+            start_time = time.perf_counter()
+            for batch in batches:
+                self._process_payload_batch(batch)
+            return len(payloads) / max(time.perf_counter() - start_time, 1e-9)
+        
+        chunksize = self.chunksize or DEFAULT_POOL_CHUNKSIZE
+        with self._create_pool(max_workers) as executor:
+            for _ in self._map_batches_in_pool(executor, max_workers, batches[:max_workers * chunksize]):
+                pass
+            start_time = time.perf_counter()
+            for _ in self._map_batches_in_pool(executor, max_workers, batches):
+                pass
+            return len(payloads) / max(time.perf_counter() - start_time, 1e-9)
+    
+    def _uses_aws_detection(self) -> bool:
+        """Check whether detection makes Comprehend or CER calls."""
+        return bool(self.detector.use_comprehend or self.detector.cer_endpoint_arn)
+    
+    def _process_batches_in_threads(self, batches: Iterable[List[Dict[str, Any]]]):
+        """Process batches on threads sharing this detector, yielding results in input order."""
+        # AWS calls release the GIL while waiting, so threads overlap them
+        # without copying the detector or its Comprehend client into processes
+        logger.info("Processing batches across %s worker threads", self.max_workers)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='payload') as executor:
+            yield from _map_bounded(executor, self._process_payload_batch, batches,
+                                    self.max_workers * TASKS_IN_FLIGHT_PER_WORKER)
+    
+    def _process_batches_in_pool(self, batches: Iterable[List[Dict[str, Any]]]):
+        """Process batches across worker processes, yielding results in input order."""
+        logger.info("Processing batches across %s worker processes", self.max_workers)
+        
+        with self._create_pool(self.max_workers) as executor:
+            yield from self._map_batches_in_pool(executor, self.max_workers, batches)
+    
+    def _create_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        """Start worker processes that each build a regex-only copy of this processor."""
+        detection_config = {
+            'use_comprehend': False,
+            'comprehend_skip_coverage': self.detector.comprehend_skip_coverage
+        }
+        
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(detection_config, self.redactor.strategy_name, self.batch_size,
+                      self.metadata_writer is not None)
+        )
+    
+    def _map_batches_in_pool(self, executor: ProcessPoolExecutor, max_workers: int,
+                             batches: Iterable[List[Dict[str, Any]]]):
+        """Process batches on an already started pool, yielding results in input order."""
+        # Several batches per task amortize pickling; the input is read only a
+        # bounded number of tasks ahead of the output
+        chunksize = self.chunksize or DEFAULT_POOL_CHUNKSIZE
+        batches = iter(batches)
+        chunks = iter(lambda: list(islice(batches, chunksize)), [])
+        
+        for chunk_results, metadata in _map_bounded(executor, _process_batches_in_worker, chunks,
+                                                    max_workers * TASKS_IN_FLIGHT_PER_WORKER):
+            if metadata:
+                self.metadata_writer.write(metadata)
+            yield from chunk_results
+    
+    def _process_payload_batch(self, batch: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], PayloadStats]]:
+        """Detect PII for a batch of payloads in one detector call, then redact each payload."""
+        try:
+            # Step 1: Detect PII in every PII field text in the batch at once
+            field_refs, texts = self._collect_field_texts(batch)
+            entities_per_text = self.detector.detect_pii_batch(texts)
+            
+        except Exception as e:
+            logger.warning("Batch detection failed, processing payloads individually: %s", e)
+            return [self.process_payload(payload) for payload in batch]
+        
+        # Step 2: Scatter entities back to their payloads
+        entities_by_payload = self._scatter_entities(len(batch), field_refs, entities_per_text)
+        
+        results = []
+        finish_payload = self._finish_payload
+        # One redaction timestamp per batch rather than per field
+        timestamp = datetime.utcnow().isoformat()
+        for payload, entities_by_field in zip(batch, entities_by_payload):
+            try:
+                results.append(finish_payload(payload, entities_by_field, timestamp))
+            except Exception as e:
+                results.append(self._failed_payload(payload, e))
+        
+        return results
+    
+    def _collect_field_texts(self, batch: List[Dict[str, Any]]) -> Tuple[List[Tuple[int, str]], List[str]]:
+        """
+        Flatten the PII field texts of a batch of payloads into one list.
+        
+        Args:
+            batch: Voice metadata payloads
+            
+        Returns:
+            Tuple of ((payload index, field name) per text, texts)
+        """
+        field_refs = []
+        texts = []
+        
+        # Bound once; this loop runs for every field of every payload
+        pii_fields = self.pii_fields
+        should_process_field = self._should_process_field
+        for i, payload in enumerate(batch):
+            for field_name in pii_fields:
+                if should_process_field(payload, field_name):
+                    field_refs.append((i, field_name))
+                    texts.append(payload[field_name])
+        
+        return field_refs, texts
+    
+    def _scatter_entities(self, payload_count: int, field_refs: List[Tuple[int, str]],
+                          entities_per_text: List[List[PIIEntity]]) -> List[Dict[str, List[PIIEntity]]]:
+        """Group detected entities by payload and field, skipping fields without PII."""
+        entities_by_payload = [{} for _ in range(payload_count)]
+        # Checked once per batch rather than formatting a message per field
+        is_debug = logger.isEnabledFor(logging.DEBUG)
+        for (i, field_name), entities in zip(field_refs, entities_per_text):
+            if entities:
+                entities_by_payload[i][field_name] = entities
+                if is_debug:
+                    logger.debug("Found %s PII entities in field '%s'", len(entities), field_name)
+        
+        return entities_by_payload
+    
+    def _finish_payload(self, payload: Dict[str, Any], 
+                        entities_by_field: Dict[str, List[PIIEntity]],
+                        timestamp: Optional[str] = None) -> Tuple[Dict[str, Any], PayloadStats]:
+        """Redact detected PII from a payload and build its processing statistics."""
+        # Step 2: Redact PII from the payload; PII-free payloads pass through uncopied
+        if entities_by_field:
+            redacted_payload = self._redact_payload_fields(payload, entities_by_field, timestamp)
+        else:
+            redacted_payload = payload
+        
+        # Step 3: Create processing statistics
+        processing_stats = PayloadStats(
+            payload_id=payload.get('verbatim_id', 'unknown'),
+            pii_detected=sum(len(entities) for entities in entities_by_field.values()),
+            fields_with_pii=list(entities_by_field.keys()),
+            status='success'
+        )
+        
+        return redacted_payload, processing_stats
+    
+    def _failed_payload(self, payload: Dict[str, Any], error: Exception) -> Tuple[Dict[str, Any], PayloadStats]:
+        """Return the original payload with failure statistics."""
+        payload_id = payload.get('verbatim_id', 'unknown')
+        logger.error("Error processing payload %s: %s", payload_id, error)
+        
+        processing_stats = PayloadStats(
+            payload_id=payload_id,
+            pii_detected=0,
+            fields_with_pii=[],
+            status='failed',
+            error=str(error)
+        )
+        
+        return payload, processing_stats
+    
     def _should_process_field(self, payload: Dict[str, Any], field_name: str) -> bool:
         """Check if field should be processed for PII."""
-        return (field_name in payload and 
-                isinstance(payload[field_name], str) and
-                payload[field_name].strip())
+        # One lookup, and isspace() scans without copying the text like strip() did.
+        # Texts that reach the detector without PII are rejected there by the
+        # regex prefilter in a single pass.
+        text = payload.get(field_name)
+        return isinstance(text, str) and bool(text) and not text.isspace()
     
     def _redact_payload_fields(self, payload: Dict[str, Any], 
-                              entities_by_field: Dict[str, List[PIIEntity]]) -> Dict[str, Any]:
+                              entities_by_field: Dict[str, List[PIIEntity]],
+                              timestamp: Optional[str] = None) -> Dict[str, Any]:
         """Redact PII from payload fields."""
         redacted_payload = payload.copy()
         all_redactions = []
+        metadata_lines = []
+        metadata_writer = self.metadata_writer
         
-        for field_name, entities in entities_by_field.items():
-            original_text = payload[field_name]
-            
-            # Redact the field
-            redaction_result = self.redactor.redact_text(original_text, entities)
+        # All of the payload's fields are redacted in one call
+        field_names = list(entities_by_field)
+        redaction_results = self.redactor.redact_texts_batch(
+            [payload[field_name] for field_name in field_names],
+            list(entities_by_field.values()),
+            timestamp
+        )
+        
+        for field_name, redaction_result in zip(field_names, redaction_results):
             redacted_payload[field_name] = redaction_result.redacted_text
             
+            if metadata_writer is not None:
+                metadata_lines.extend(self._metadata_lines(
+                    payload.get('verbatim_id', 'unknown'), field_name, redaction_result
+                ))
+                continue
+            
             # Add field context to metadata
             for redaction in redaction_result.entities_redacted:
                 redaction['field_name'] = field_name
             all_redactions.extend(redaction_result.entities_redacted)
         
+        # One write per payload, so lines from concurrent threads never interleave
+        if metadata_lines:
+            metadata_writer.write(b''.join(metadata_lines))
+        
         # Add overall redaction metadata to payload
         if all_redactions:
             redacted_payload['_redaction_metadata'] = {
@@ -143,6 +413,22 @@ class PayloadProcessor:
         
         return redacted_payload
     
+    def _metadata_lines(self, payload_id: Any, field_name: str,
+                        redaction_result: RedactionResult) -> List[bytes]:
+        """Encode one sidecar JSON line per redaction in a field; original text is left out."""
+        return [
+            json.dumps({
+                'payload_id': payload_id,
+                'field_name': field_name,
+                'entity_type': redaction['entity_type'],
+                'start': redaction['start_pos'],
+                'end': redaction['end_pos'],
+                'strategy': redaction_result.strategy_used,
+                'redacted_at': redaction_result.redacted_at
+            }, ensure_ascii=False).encode('utf-8') + b'\n'
+            for redaction in redaction_result.entities_redacted
+        ]
+    
     def get_processor_info(self) -> Dict[str, Any]:
         """Get information about the processor configuration."""
         return {
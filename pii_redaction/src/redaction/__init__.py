@@ -0,0 +1,17 @@
+"""
+PII Redaction
+Replaces detected PII entities in text using a configurable strategy.
+"""
+
+from .redaction_result import RedactionResult
+from .redaction_strategies import get_strategy, get_available_strategies
+from .redaction_validator import validate_redaction
+from .text_redactor import TextRedactor
+
+__all__ = [
+    'TextRedactor',
+    'RedactionResult',
+    'get_strategy',
+    'get_available_strategies',
+    'validate_redaction'
+]
\ No newline at end of file
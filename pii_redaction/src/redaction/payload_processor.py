@@ -5,64 +5,117 @@ Handles voice metadata payload redaction using TextRedactor.
 """
 
 import logging
-from typing import Dict, List, Any
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 # Import detection types
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from detection.pii_entity import PIIEntity
+from ..detection.pii_entity import PIIEntity
 
-from text_redactor import TextRedactor
+from .text_redactor import TextRedactor
 
 logger = logging.getLogger(__name__)
 
+# Chunks kept in flight per worker; more only holds pickled payloads in memory
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Per-process PayloadProcessor, built once by the pool initializer
+_WORKER_PROCESSOR: Optional['PayloadProcessor'] = None
+
+def _init_worker(strategy_name: str):
+    """Build the worker's redactor once, so its strategy state is reused across payloads."""
+    global _WORKER_PROCESSOR
+    _WORKER_PROCESSOR = PayloadProcessor(strategy_name)
+
+def _process_chunk_in_worker(chunk: List[Tuple[Dict[str, Any], Dict[str, List[PIIEntity]]]],
+                             timestamp: str) -> List[Dict[str, Any]]:
+    """Redact a chunk of (payload, entities_by_field) items with the worker's PayloadProcessor."""
+    return [
+        _WORKER_PROCESSOR.process_payload(payload, entities_by_field, timestamp)
+        for payload, entities_by_field in chunk
+    ]
+
 class PayloadProcessor:
     """Processes voice metadata payloads for PII redaction."""
     
-    def __init__(self, strategy_name: str = 'placeholder'):
+    def __init__(self, strategy_name: str = 'placeholder', max_workers: int = 1,
+                 chunksize: int = 64):
         """
         Initialize payload processor.
         
         Args:
             strategy_name: Redaction strategy to use
+            max_workers: Worker processes for process_multiple_payloads (1 processes in-line)
+            chunksize: Payloads sent to a worker process per task
         """
         self.redactor = TextRedactor(strategy_name)
+        self.max_workers = max_workers
+        self.chunksize = chunksize
         self.pii_fields = ['sentence', 'description', 'notes', 'comments', 'transcript']
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def close(self):
+        """Shut down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
     
     def process_payload(self, payload: Dict[str, Any], 
-                       entities_by_field: Dict[str, List[PIIEntity]]) -> Dict[str, Any]:
+                       entities_by_field: Dict[str, List[PIIEntity]],
+                       timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Process a single voice metadata payload.
         
         Args:
             payload: Original payload
             entities_by_field: PII entities grouped by field name
+            timestamp: ISO redaction time shared by a batch (default: now)
             
         Returns:
-            Redacted payload with metadata
+            Redacted payload with metadata. Payloads with nothing to redact are
+            returned as-is rather than copied, so callers must not mutate the
+            input and output payloads independently.
         """
+        fields_to_redact = [
+            (field_name, entities) for field_name, entities in entities_by_field.items()
+            if entities and self._should_process_field(payload, field_name)
+        ]
+        
+        # Clean payloads are the common case; they skip the copy entirely
+        if not fields_to_redact:
+            return payload
+        
         redacted_payload = payload.copy()
         all_redactions = []
+        timestamp = timestamp or datetime.utcnow().isoformat()
         
-        for field_name, entities in entities_by_field.items():
-            if self._should_process_field(payload, field_name):
-                original_text = payload[field_name]
-                
-                # Redact the field
-                result = self.redactor.redact_text(original_text, entities)
-                redacted_payload[field_name] = result.redacted_text
-                
-                # Add field context to metadata
-                for redaction in result.entities_redacted:
-                    redaction['field_name'] = field_name
-                all_redactions.extend(result.entities_redacted)
+        # All of the payload's fields are redacted in one call
+        results = self.redactor.redact_texts_batch(
+            [payload[field_name] for field_name, _ in fields_to_redact],
+            [entities for _, entities in fields_to_redact],
+            timestamp
+        )
+        
+        for (field_name, _), result in zip(fields_to_redact, results):
+            redacted_payload[field_name] = result.redacted_text
+            
+            # Add field context to metadata
+            for redaction in result.entities_redacted:
+                redaction['field_name'] = field_name
+            all_redactions.extend(result.entities_redacted)
         
         # Add payload-level metadata
         if all_redactions:
             redacted_payload['_redaction_metadata'] = {
-                'redacted_at': datetime.utcnow().isoformat(),
+                'redacted_at': timestamp,
                 'redaction_count': len(all_redactions),
                 'strategy_used': self.redactor.strategy_name,
                 'redactions': all_redactions
@@ -82,13 +135,50 @@ class PayloadProcessor:
         Returns:
             List of redacted payloads
         """
+        # One timestamp for the whole batch; formatting it per payload adds up
+        timestamp = datetime.utcnow().isoformat()
+        
+        if self.max_workers > 1 and len(payloads) > 1:
+            redacted_payloads = self._process_in_pool(payloads, detection_results, timestamp)
+        else:
+            redacted_payloads = [
+                self.process_payload(payload, entities_by_field, timestamp)
+                for payload, entities_by_field in zip(payloads, detection_results)
+            ]
+        
+        logger.info("Processed %s payloads", len(payloads))
+        return redacted_payloads
+    
+    def _process_in_pool(self, payloads: List[Dict[str, Any]],
+                         detection_results: List[Dict[str, List[PIIEntity]]],
+                         timestamp: str) -> List[Dict[str, Any]]:
+        """Redact payloads across worker processes, returning them in input order."""
+        logger.info("Redacting %s payloads across %s worker processes", len(payloads), self.max_workers)
+        
+        # The pool is started once per processor, so later calls skip worker start-up
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.redactor.strategy_name,)
+            )
+        
+        # Payloads are independent, so each worker redacts whole chunks of them;
+        # chunks are submitted only as earlier ones complete, which bounds memory
+        items = zip(payloads, detection_results)
+        chunks = iter(lambda: list(islice(items, self.chunksize)), [])
+        max_in_flight = self.max_workers * CHUNKS_IN_FLIGHT_PER_WORKER
+        pending = deque()
         redacted_payloads = []
         
-        for payload, entities_by_field in zip(payloads, detection_results):
-            redacted_payload = self.process_payload(payload, entities_by_field)
-            redacted_payloads.append(redacted_payload)
+        for chunk in chunks:
+            if len(pending) >= max_in_flight:
+                redacted_payloads.extend(pending.popleft().result())
+            pending.append(self._pool.submit(_process_chunk_in_worker, chunk, timestamp))
+        
+        while pending:
+            redacted_payloads.extend(pending.popleft().result())
         
-        logger.info(f"Processed {len(payloads)} payloads")
         return redacted_payloads
     
     def _should_process_field(self, payload: Dict[str, Any], field_name: str) -> bool:
@@ -99,8 +189,6 @@ class PayloadProcessor:
 
 def test_payload_processor():
     """Test payload processing."""
-    from detection.pii_entity import PIIEntity
-    
     # Sample payload
     payload = {
         "verbatim_id": 12345,
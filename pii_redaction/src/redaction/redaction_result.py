@@ -5,12 +5,12 @@ Simple dataclass for redaction results.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class RedactionResult:
-    """Result of redacting text."""
+    """Result of redacting text. Slotted: one is built per redacted field."""
     original_text: str
     redacted_text: str
     entities_redacted: List[Dict[str, Any]]
@@ -19,7 +19,7 @@ class RedactionResult:
     redacted_at: str
     
     @classmethod
-    def create_empty(cls, text: str, strategy: str) -> 'RedactionResult':
+    def create_empty(cls, text: str, strategy: str, redacted_at: Optional[str] = None) -> 'RedactionResult':
         """Create result for text with no redactions."""
         return cls(
             original_text=text,
@@ -27,5 +27,5 @@ class RedactionResult:
             entities_redacted=[],
             redaction_count=0,
             strategy_used=strategy,
-            redacted_at=datetime.utcnow().isoformat()
+            redacted_at=redacted_at or datetime.utcnow().isoformat()
         )
\ No newline at end of file
@@ -5,7 +5,45 @@ Different approaches for redacting PII from text.
 Consistent with detection module style - simple and direct.
 """
 
+import hashlib
 from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Callable, Mapping, Optional
+
+# Distinct PII strings whose hash placeholders stay cached
+HASH_CACHE_SIZE = 8192
+
+class _DigitFilter(dict):
+    """
+    str.translate table keeping exactly the characters str.isdigit() accepts.
+    
+    Filled lazily, one entry per distinct code point, so translate drops
+    non-digits in C instead of calling a predicate per character. A regex
+    would not match isdigit exactly: it misses digits like '²'.
+    """
+    
+    def __missing__(self, code_point: int):
+        keep = code_point if chr(code_point).isdigit() else None
+        self[code_point] = keep
+        return keep
+
+# ASCII is filled up front; other code points on first sight
+_KEEP_DIGITS = _DigitFilter((c, c if chr(c).isdigit() else None) for c in range(128))
+
+class _TypeTable(dict):
+    """Replacement per entity type, with a default for types not listed."""
+    
+    def __init__(self, replacements: Mapping[str, str], default: str):
+        super().__init__(replacements)
+        self.default = default
+    
+    def __missing__(self, entity_type: str) -> str:
+        return self.default
+
+def _mask_middle(text: str, keep_head: int, keep_tail: int) -> str:
+    """Replace all but the first keep_head and last keep_tail characters with asterisks."""
+    # Slicing and str repetition already run at memcpy speed in C
+    return text[:keep_head] + '*' * (len(text) - keep_head - keep_tail) + text[len(text) - keep_tail:]
 
 class RedactionStrategy(ABC):
     """Abstract base class for redaction strategies."""
@@ -23,12 +61,31 @@ class RedactionStrategy(ABC):
             Redacted replacement text
         """
         pass
+    
+    def get_callable(self) -> Callable[[str, str], str]:
+        """
+        Get the function that redacts (original_text, entity_type).
+        
+        Bound once by callers so per-entity calls skip method resolution;
+        strategies override this with a cheaper equivalent of redact.
+        """
+        return self.redact
+    
+    def get_type_table(self) -> Optional[Mapping[str, str]]:
+        """
+        Get the replacement for each entity type, if it depends on nothing else.
+        
+        Callers then index the table instead of calling a function per
+        entity. Strategies that look at the PII text return None.
+        """
+        return None
 
 class PlaceholderStrategy(RedactionStrategy):
     """Replace PII with typed placeholders like [REDACTED_EMAIL]."""
     
     def __init__(self):
-        self.placeholders = {
+        # Indexed directly: unknown types fall back to '[REDACTED]' via __missing__
+        self.placeholders = _TypeTable({
             'EMAIL': '[REDACTED_EMAIL]',
             'PHONE': '[REDACTED_PHONE]',
             'PERSON': '[REDACTED_PERSON]',
@@ -39,50 +96,53 @@ class PlaceholderStrategy(RedactionStrategy):
             'CUSTOMER_ACCOUNT': '[REDACTED_ACCOUNT]',
             'NAME': '[REDACTED_NAME]',
             'OTHER': '[REDACTED]'
-        }
+        }, '[REDACTED]')
     
     def redact(self, original_text: str, entity_type: str) -> str:
-        return self.placeholders.get(entity_type, '[REDACTED]')
+        return self.placeholders[entity_type]
+    
+    def get_type_table(self) -> Optional[Mapping[str, str]]:
+        return self.placeholders
 
 class MaskStrategy(RedactionStrategy):
     """Mask PII by showing first/last characters with asterisks."""
     
     def redact(self, original_text: str, entity_type: str) -> str:
         text = original_text.strip()
+        length = len(text)
         
-        if len(text) <= 2:
-            return '*' * len(text)
-        elif len(text) <= 4:
-            return text[0] + '*' * (len(text) - 2) + text[-1]
+        if length <= 2:
+            return '*' * length
+        elif length <= 4:
+            return _mask_middle(text, 1, 1)
         else:
             # Show first 2 and last 1 character for longer text
-            middle_length = len(text) - 3
-            return text[:2] + '*' * middle_length + text[-1]
+            return _mask_middle(text, 2, 1)
 
 class RemoveStrategy(RedactionStrategy):
     """Completely remove PII from text."""
     
     def redact(self, original_text: str, entity_type: str) -> str:
         return ''
+    
+    def get_type_table(self) -> Optional[Mapping[str, str]]:
+        return _TypeTable({}, '')
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def _hash_placeholder(original_text: str, entity_type: str) -> str:
+    """Build the hash placeholder for a PII string; bounded cache for repeated values."""
+    # 4-byte BLAKE2b digest gives the same 8 hex characters as the old truncated MD5
+    hash_str = hashlib.blake2b(original_text.encode('utf-8'), digest_size=4).hexdigest()
+    return f"[{entity_type}_{hash_str}]"
 
 class HashStrategy(RedactionStrategy):
     """Replace PII with a consistent hash."""
     
-    def __init__(self):
-        self.hash_cache = {}
-    
     def redact(self, original_text: str, entity_type: str) -> str:
-        # Use cached hash for consistency
-        if original_text in self.hash_cache:
-            return self.hash_cache[original_text]
-        
-        import hashlib
-        hash_obj = hashlib.md5(original_text.encode())
-        hash_str = hash_obj.hexdigest()[:8]  # Use first 8 characters
-        redacted = f"[{entity_type}_{hash_str}]"
-        
-        self.hash_cache[original_text] = redacted
-        return redacted
+        return _hash_placeholder(original_text, entity_type)
+    
+    def get_callable(self) -> Callable[[str, str], str]:
+        return _hash_placeholder
 
 class PartialStrategy(RedactionStrategy):
     """Keep some characters visible based on PII type."""
@@ -91,23 +151,23 @@ class PartialStrategy(RedactionStrategy):
         text = original_text.strip()
         
         if entity_type == 'EMAIL':
-            # Show domain but mask username
-            if '@' in text:
-                username, domain = text.split('@', 1)
+            # Show domain but mask username; partition finds the first '@' in one scan
+            username, at, domain = text.partition('@')
+            if at:
                 masked_username = username[0] + '*' * (len(username) - 1) if username else '*'
                 return f"{masked_username}@{domain}"
             return self._default_mask(text)
         
         elif entity_type == 'PHONE':
             # Show last 4 digits
-            digits_only = ''.join(filter(str.isdigit, text))
+            digits_only = text.translate(_KEEP_DIGITS)
             if len(digits_only) >= 4:
                 return f"***-***-{digits_only[-4:]}"
             return self._default_mask(text)
         
         elif entity_type == 'CREDIT_CARD':
             # Show last 4 digits
-            digits_only = ''.join(filter(str.isdigit, text))
+            digits_only = text.translate(_KEEP_DIGITS)
             if len(digits_only) >= 4:
                 return f"****-****-****-{digits_only[-4:]}"
             return self._default_mask(text)
@@ -119,7 +179,7 @@ class PartialStrategy(RedactionStrategy):
         """Default masking for unknown types."""
         if len(text) <= 2:
             return '*' * len(text)
-        return text[0] + '*' * (len(text) - 2) + text[-1]
+        return _mask_middle(text, 1, 1)
 
 # Strategy registry (simple dictionary)
 STRATEGIES = {
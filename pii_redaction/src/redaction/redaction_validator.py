@@ -4,8 +4,45 @@ Redaction Validation
 Simple validation functions for redaction results.
 """
 
-from typing import Dict, Any
-from redaction_result import RedactionResult
+from typing import Dict, Any, Set
+from .redaction_result import RedactionResult
+
+# pyahocorasick finds every PII string in one pass; substring checks are the fallback
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Below this many PII strings, separate substring scans beat building an automaton
+AHOCORASICK_MIN_PATTERNS = 8
+
+def _find_present(patterns: Set[str], text: str) -> Set[str]:
+    """
+    Find which patterns occur in text.
+    
+    Args:
+        patterns: Strings to look for
+        text: Text to search
+        
+    Returns:
+        The patterns found in text
+    """
+    if ahocorasick is None or len(patterns) < AHOCORASICK_MIN_PATTERNS:
+        return {pattern for pattern in patterns if pattern in text}
+    
+    # The empty string is in every text but cannot be added to an automaton
+    present = {''} if '' in patterns else set()
+    
+    automaton = ahocorasick.Automaton()
+    for pattern in patterns:
+        if pattern:
+            automaton.add_word(pattern, pattern)
+    
+    if len(automaton):
+        automaton.make_automaton()
+        present.update(pattern for _, pattern in automaton.iter(text))
+    
+    return present
 
 def validate_redaction(result: RedactionResult) -> Dict[str, Any]:
     """
@@ -23,12 +60,19 @@ def validate_redaction(result: RedactionResult) -> Dict[str, Any]:
         'warnings': []
     }
     
-    # Check that no original PII text remains
-    for redaction in result.entities_redacted:
-        original_pii = redaction['original_text'].lower()
-        redacted_text_lower = result.redacted_text.lower()
-        
-        if original_pii in redacted_text_lower:
+    # Check that no original PII text remains; the text is scanned once for all of it.
+    # casefold() rather than lower() so case variants like 'STRASSE' and 'straße' match.
+    folded_redactions = [
+        (redaction, redaction['original_text'].casefold())
+        for redaction in result.entities_redacted
+    ]
+    leaked = _find_present(
+        {folded for _, folded in folded_redactions},
+        result.redacted_text.casefold()
+    )
+    
+    for redaction, folded in folded_redactions:
+        if folded in leaked:
             validation['is_valid'] = False
             validation['errors'].append(
                 f"PII text '{redaction['original_text']}' still present in redacted text"
@@ -5,21 +5,27 @@ Main redaction orchestrator - focused on core redaction logic only.
 """
 
 import logging
-from typing import List, Dict, Any
+from operator import attrgetter
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 # Import detection types
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from detection.pii_entity import PIIEntity
+from ..detection.pii_entity import PIIEntity
 
-from redaction_strategies import get_strategy, get_available_strategies
-from redaction_result import RedactionResult
-from redaction_validator import validate_redaction
+from .redaction_strategies import get_strategy, get_available_strategies
+from .redaction_result import RedactionResult
+from .redaction_validator import validate_redaction
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 logger = logging.getLogger(__name__)
 
+# Below this many entities, building arrays costs more than the skipped work saves
+NUMPY_OVERLAP_MIN_ENTITIES = 128
+
 class TextRedactor:
     """Main text redaction orchestrator - simplified and focused."""
     
@@ -32,63 +38,174 @@ class TextRedactor:
         """
         self.strategy_name = strategy_name
         self.strategy = get_strategy(strategy_name)
-        logger.info(f"Initialized TextRedactor with strategy: {strategy_name}")
+        self._redact_fn = self.strategy.get_callable()
+        self._type_table = self.strategy.get_type_table()
+        logger.info("Initialized TextRedactor with strategy: %s", strategy_name)
     
-    def redact_text(self, text: str, entities: List[PIIEntity]) -> RedactionResult:
+    def redact_text(self, text: str, entities: List[PIIEntity],
+                    timestamp: Optional[str] = None,
+                    metadata: bool = True) -> RedactionResult:
         """
         Redact PII entities from text.
         
         Args:
             text: Original text
             entities: List of detected PII entities
+            timestamp: ISO redaction time shared by a batch (default: now)
+            metadata: Build a metadata dict per redaction; callers that only
+                need the text and count pass False to skip them
             
         Returns:
-            RedactionResult with redacted text and metadata
+            RedactionResult with redacted text and metadata (entities_redacted
+            is left empty when metadata is False, so it cannot be validated)
         """
         if not entities:
-            return RedactionResult.create_empty(text, self.strategy_name)
+            return RedactionResult.create_empty(text, self.strategy_name, timestamp)
+        
+        result = self._redact_entities(
+            text, entities, timestamp or datetime.utcnow().isoformat(), metadata,
+            logger.isEnabledFor(logging.DEBUG)
+        )
+        
+        logger.info("Redacted %s PII entities", result.redaction_count)
+        return result
+    
+    def redact_texts_batch(self, texts: List[str], entities_per_text: List[List[PIIEntity]],
+                           timestamp: Optional[str] = None,
+                           metadata: bool = True) -> List[RedactionResult]:
+        """
+        Redact PII entities from several texts, such as the fields of one payload.
         
-        # Sort entities by start position in descending order
-        sorted_entities = sorted(entities, key=lambda x: x.start_pos, reverse=True)
+        Same results as calling redact_text per text, but the timestamp, log
+        level check and logging happen once for the whole batch.
+        
+        Args:
+            texts: Original texts
+            entities_per_text: Detected PII entities for each text
+            timestamp: ISO redaction time shared by the batch (default: now)
+            metadata: Build a metadata dict per redaction
+            
+        Returns:
+            RedactionResult for each text, in input order
+        """
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        is_debug = logger.isEnabledFor(logging.DEBUG)
+        redact_entities = self._redact_entities
+        
+        results = [
+            redact_entities(text, entities, timestamp, metadata, is_debug) if entities
+            else RedactionResult.create_empty(text, self.strategy_name, timestamp)
+            for text, entities in zip(texts, entities_per_text)
+        ]
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Redacted %s PII entities across %s texts",
+                        sum(result.redaction_count for result in results), len(results))
+        return results
+    
+    def _redact_entities(self, text: str, entities: List[PIIEntity], timestamp: str,
+                         metadata: bool, is_debug: bool) -> RedactionResult:
+        """Build the redacted text and its metadata for a non-empty entity list."""
+        # Sort entities by start position; one left-to-right pass builds the text.
+        # Most fields hold a single entity, which needs no sort.
+        if len(entities) == 1:
+            sorted_entities = entities
+        elif np is not None and len(entities) >= NUMPY_OVERLAP_MIN_ENTITIES:
+            sorted_entities = self._sort_dropping_dominated(entities)
+        else:
+            sorted_entities = sorted(entities, key=attrgetter('start_pos'))
         
-        redacted_text = text
         redaction_metadata = []
+        parts = []
+        position = 0
+        redact = self._redact_fn
+        type_table = self._type_table
         
         for entity in sorted_entities:
-            # Get redaction replacement
-            replacement = self.strategy.redact(entity.text, entity.entity_type)
+            # Each field is read off the entity once
+            start_pos = entity.start_pos
+            end_pos = entity.end_pos
+            entity_type = entity.entity_type
+            original_text = entity.text
             
-            # Replace in text
-            redacted_text = (
-                redacted_text[:entity.start_pos] + 
-                replacement + 
-                redacted_text[entity.end_pos:]
-            )
+            # Overlaps (never produced by the detector): a span already redacted
+            # is skipped, and only the uncovered tail of a partial overlap is redacted
+            if start_pos < position:
+                if end_pos <= position:
+                    continue
+                start_pos = position
+                original_text = text[start_pos:end_pos]
+            
+            # Get redaction replacement; type-only strategies need no call
+            if type_table is not None:
+                replacement = type_table[entity_type]
+            else:
+                replacement = redact(original_text, entity_type)
+            
+            parts.append(text[position:start_pos])
+            parts.append(replacement)
+            position = end_pos
             
             # Track redaction metadata
-            redaction_metadata.append({
-                'original_text': entity.text,
-                'entity_type': entity.entity_type,
-                'start_pos': entity.start_pos,
-                'end_pos': entity.end_pos,
-                'replacement': replacement,
-                'confidence': entity.confidence,
-                'source': entity.source
-            })
+            if metadata:
+                redaction_metadata.append({
+                    'original_text': original_text,
+                    'entity_type': entity_type,
+                    'start_pos': start_pos,
+                    'end_pos': end_pos,
+                    'replacement': replacement,
+                    'confidence': entity.confidence,
+                    'source': entity.source
+                })
             
-            logger.debug(f"Redacted {entity.entity_type}: '{entity.text}' → '{replacement}'")
+            if is_debug:
+                logger.debug("Redacted %s: '%s' → '%s'", entity_type, original_text, replacement)
         
-        result = RedactionResult(
+        # Each redaction added a preceding slice and its replacement
+        redaction_count = len(parts) // 2
+        parts.append(text[position:])
+        
+        return RedactionResult(
             original_text=text,
-            redacted_text=redacted_text,
+            redacted_text=''.join(parts),
             entities_redacted=redaction_metadata,
-            redaction_count=len(redaction_metadata),
+            redaction_count=redaction_count,
             strategy_used=self.strategy_name,
-            redacted_at=datetime.utcnow().isoformat()
+            redacted_at=timestamp
         )
+    
+    def _sort_dropping_dominated(self, entities: List[PIIEntity]) -> List[PIIEntity]:
+        """
+        Sort entities by start position, dropping those inside an earlier span.
         
-        logger.info(f"Redacted {len(redaction_metadata)} PII entities")
-        return result
+        Vectorized version of the skip in the redaction loop, for the large
+        overlapping entity lists that several detectors can produce together.
+        
+        Args:
+            entities: Entities to redact
+            
+        Returns:
+            Entities in start order, without fully covered ones
+        """
+        count = len(entities)
+        starts = np.fromiter((entity.start_pos for entity in entities), dtype=np.int64, count=count)
+        ends = np.fromiter((entity.end_pos for entity in entities), dtype=np.int64, count=count)
+        
+        # The running-maximum reach below assumes well-formed spans
+        if (ends < starts).any():
+            return sorted(entities, key=attrgetter('start_pos'))
+        
+        order = np.argsort(starts, kind='stable')
+        starts = starts[order]
+        ends = ends[order]
+        
+        # How far the spans before each entity reach into the text
+        reach = np.empty(count, dtype=np.int64)
+        reach[0] = 0
+        np.maximum.accumulate(ends[:-1], out=reach[1:])
+        
+        dominated = (starts < reach) & (ends <= reach)
+        return [entities[i] for i in order[~dominated]]
     
     def get_redaction_info(self) -> Dict[str, Any]:
         """Get information about current redaction configuration."""
@@ -100,8 +217,6 @@ class TextRedactor:
 
 def test_redactor():
     """Simple test of the redactor."""
-    from detection.pii_entity import PIIEntity
-    
     # Mock test entities
     test_entities = [
         PIIEntity("john@email.com", "EMAIL", 15, 29, 0.95, "REGEX"),
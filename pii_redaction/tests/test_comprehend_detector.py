@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Comprehend detection tests, run against an in-memory stand-in for the
+boto3 client so no AWS account is needed.
+"""
+
+import asyncio
+import multiprocessing
+import re
+import sys
+import threading
+
+import pytest
+
+from ..src.detection import comprehend_detector
+from ..src.detection.async_comprehend_detector import AsyncComprehendDetector
+from ..src.detection.comprehend_detector import (
+    ComprehendDetector, batch_indices, pack_batch, scatter_batch_entities
+)
+from ..src.detection.pii_detector import PIIDetector
+from ..src.detection.pii_entity import PIIEntity
+
+TEXTS = [
+    "Customer John Smith called from john.smith@email.com",
+    "Please call me back at 555-123-4567 or (555) 987-6543",
+    "My address is 123 Main Street, Springfield, IL 62701",
+    "Thank you for your help today",
+    "My name is Maria Gonzalez and my SSN is 123-45-6789",
+    "Card number 4111 1111 1111 1111, expiring soon",
+    "Écrivez à Zoë Dupont, zoë@exemple.fr, merci",
+    "Ends with Anna",
+    "Lee starts this one",
+    "",
+    "   ",
+    "Mhm.",
+    "Reach me at JANE.DOE@EXAMPLE.ORG\x0bor 555.321.9876",
+]
+
+class FakeComprehendClient:
+    """Finds capitalised name pairs and phone numbers, whatever text surrounds them."""
+
+    NAME_RE = re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b')
+    PHONE_RE = re.compile(r'\d{3}-\d{3}-\d{4}')
+
+    def __init__(self, fail_when=None):
+        self.calls = 0
+        self.fail_when = fail_when
+        self._lock = threading.Lock()
+
+    def detect_pii_entities(self, Text, LanguageCode):
+        with self._lock:
+            self.calls += 1
+        if self.fail_when and self.fail_when(Text):
+            raise RuntimeError("throttled")
+
+        entities = []
+        for entity_type, pattern, score in (('NAME', self.NAME_RE, 0.93), ('PHONE', self.PHONE_RE, 0.99)):
+            for match in pattern.finditer(Text):
+                entities.append({
+                    'Type': entity_type, 'Score': score,
+                    'BeginOffset': match.start(), 'EndOffset': match.end()
+                })
+        return {'Entities': entities}
+
+class FakeAsyncComprehendClient:
+    """Coroutine version of FakeComprehendClient, as returned by aioboto3."""
+
+    def __init__(self):
+        self._client = FakeComprehendClient()
+
+    async def detect_pii_entities(self, Text, LanguageCode):
+        await asyncio.sleep(0)
+        return self._client.detect_pii_entities(Text=Text, LanguageCode=LanguageCode)
+
+def _comprehend_detector(client):
+    detector = ComprehendDetector(max_workers=4)
+    detector.comprehend_client = client
+    return detector
+
+def _pii_detector(client, cache_size=10000):
+    """PIIDetector with Comprehend backed by client."""
+    detector = PIIDetector(use_comprehend=False, cache_size=cache_size)
+    detector.comprehend_detector = _comprehend_detector(client)
+    detector.use_comprehend = True
+    return detector
+
+def _many_texts():
+    return [f"{TEXTS[i % len(TEXTS)]} #{i // len(TEXTS)}" if i % 5 else TEXTS[i % len(TEXTS)]
+            for i in range(80)]
+
+def test_batches_respect_request_limits(monkeypatch):
+    monkeypatch.setattr(comprehend_detector, 'MAX_BATCH_BYTES', 200)
+    texts = _many_texts() + ["x" * 500]
+
+    batches = list(batch_indices(texts))
+
+    assert [i for batch in batches for i in batch] == [
+        i for i, text in enumerate(texts) if text and text.strip()
+    ]
+    for batch in batches:
+        assert len(batch) <= comprehend_detector.BATCH_SIZE
+        batch_bytes = sum(len(texts[i].encode('utf-8')) + len(comprehend_detector.BATCH_SEPARATOR)
+                          for i in batch)
+        assert len(batch) == 1 or batch_bytes <= 200
+
+@pytest.mark.parametrize('max_batch_bytes', [comprehend_detector.MAX_BATCH_BYTES, 200])
+def test_packed_batches_match_one_call_per_text(monkeypatch, max_batch_bytes):
+    monkeypatch.setattr(comprehend_detector, 'MAX_BATCH_BYTES', max_batch_bytes)
+    texts = _many_texts()
+    per_text_client = FakeComprehendClient()
+    packed_client = FakeComprehendClient()
+
+    per_text = [_comprehend_detector(per_text_client).detect_pii(text) for text in texts]
+    packed = _comprehend_detector(packed_client).detect_pii_batch(texts)
+
+    assert packed == per_text
+    assert any(per_text)
+    assert packed_client.calls < per_text_client.calls
+
+def test_entities_across_the_separator_are_dropped():
+    texts = ["Ends with Anna", "Lee starts this one"]
+    packed_text, offsets = pack_batch(texts, [0, 1])
+    results = [[], []]
+    response = {'Entities': [
+        {'Type': 'NAME', 'Score': 0.9, 'BeginOffset': 10, 'EndOffset': packed_text.index(' starts')},
+        {'Type': 'NAME', 'Score': 0.9, 'BeginOffset': offsets[1], 'EndOffset': offsets[1] + 3},
+    ]}
+
+    assert scatter_batch_entities(texts, [0, 1], offsets, response, results) == 1
+    assert results == [[], [PIIEntity('Lee', 'NAME', 0, 3, 0.9, 'COMPREHEND')]]
+
+def _cache_sizes_in_child(queue):
+    queue.put((len(comprehend_detector._CLIENT_CACHE), len(comprehend_detector._EXECUTOR_CACHE)))
+
+def test_forked_children_start_without_shared_clients_or_pools():
+    """A child must not reuse the parent's keep-alive connections or thread-less pools."""
+    context = multiprocessing.get_context('fork')
+    comprehend_detector._CLIENT_CACHE[('test-region', 50)] = object()
+    comprehend_detector._get_executor(1)
+    try:
+        queue = context.Queue()
+        child = context.Process(target=_cache_sizes_in_child, args=(queue,))
+        child.start()
+        assert queue.get(timeout=30) == (0, 0)
+        child.join()
+    finally:
+        comprehend_detector._CLIENT_CACHE.pop(('test-region', 50))
+
+def test_pii_detector_packs_comprehend_requests_only_on_request():
+    """Packing changes Comprehend's context, so by default every text gets its own request."""
+    texts = sorted(set(_many_texts()))
+    default_client = FakeComprehendClient()
+    packing_client = FakeComprehendClient()
+    packing = _pii_detector(packing_client)
+    packing.pack_comprehend_batches = True
+
+    results = _pii_detector(default_client).detect_pii_batch(texts)
+
+    assert default_client.calls == sum(1 for text in texts if text and text.strip())
+    assert packing.detect_pii_batch(texts) == results
+    assert packing_client.calls < default_client.calls
+
+def test_comprehend_is_skipped_only_when_no_letters_escape_regex():
+    client = FakeComprehendClient()
+    detector = _pii_detector(client, cache_size=0)
+    detector.comprehend_skip_coverage = 0.30
+
+    detector.detect_pii("john.smith@email.com 555-123-4567")
+    assert client.calls == 0
+
+    entities = detector.detect_pii_batch(["Maria Gonzalez 555-123-4567", "Ask for Anna Lee, 555-987-6543"])
+    assert client.calls == 2
+    assert any(entity.source == 'COMPREHEND' for entity in entities[0])
+
+def test_cached_detection_matches_uncached():
+    texts = _many_texts() * 2
+    cached_client = FakeComprehendClient()
+    cached = _pii_detector(cached_client)
+
+    uncached_results = _pii_detector(FakeComprehendClient(), cache_size=0).detect_pii_batch(texts)
+
+    assert cached.detect_pii_batch(texts) == uncached_results
+    assert [cached.detect_pii(text) for text in texts] == uncached_results
+    assert cached_client.calls == len({text for text in texts if text and text.strip()})
+
+def test_failed_comprehend_call_is_not_cached():
+    client = FakeComprehendClient(fail_when=lambda text: True)
+    detector = _pii_detector(client)
+    text = TEXTS[0]
+
+    detector.detect_pii(text)
+    client.fail_when = None
+    entities = detector.detect_pii(text)
+
+    assert client.calls == 2
+    assert any(entity.source == 'COMPREHEND' for entity in entities)
+    assert detector.detect_pii_batch([text]) == [entities]
+    assert client.calls == 2
+
+def test_failed_batch_is_reported():
+    texts = _many_texts()
+    detector = _comprehend_detector(FakeComprehendClient(fail_when=lambda text: 'Maria' in text))
+    failed = set()
+
+    results = detector.detect_pii_many(texts, failed)
+
+    assert failed == {i for i, text in enumerate(texts) if 'Maria' in text}
+    assert all(results[i] == [] for i in failed)
+    assert any(results)
+
+def test_concurrent_calls_match_one_call_per_text():
+    texts = _many_texts()
+    detector = _comprehend_detector(FakeComprehendClient())
+
+    assert detector.detect_pii_many(texts) == [detector.detect_pii(text) for text in texts]
+
+def test_detectors_share_one_thread_pool_per_size():
+    assert ComprehendDetector(max_workers=3)._executor is ComprehendDetector(max_workers=3)._executor
+    assert ComprehendDetector(max_workers=3)._executor is not ComprehendDetector(max_workers=5)._executor
+
+def test_async_detector_matches_threaded_detector():
+    texts = _many_texts()
+    threaded = _comprehend_detector(FakeComprehendClient())
+    per_text = [threaded.detect_pii(text) for text in texts]
+
+    async def detect():
+        detector = AsyncComprehendDetector(max_concurrency=4)
+        detector._session = None
+        detector._fallback_detector = None
+        detector._client = FakeAsyncComprehendClient()
+        return (await detector.detect_pii_batch(texts),
+                await detector.detect_pii_many(texts),
+                await detector.detect_pii(texts[0]))
+
+    batch_results, many_results, single_result = asyncio.run(detect())
+
+    assert batch_results == threaded.detect_pii_batch(texts)
+    assert many_results == per_text
+    assert single_result == per_text[0]
+
+def test_async_detector_falls_back_to_threads(monkeypatch):
+    """Without aioboto3 the async detector delegates to the threaded detector."""
+    monkeypatch.setitem(sys.modules, 'aioboto3', None)
+    texts = _many_texts()
+    per_text = [_comprehend_detector(FakeComprehendClient()).detect_pii(text) for text in texts]
+
+    async def detect():
+        async with AsyncComprehendDetector(max_concurrency=4) as detector:
+            assert detector._fallback_detector is not None
+            detector._fallback_detector.comprehend_client = FakeComprehendClient()
+            return await detector.detect_pii_many(texts)
+
+    assert asyncio.run(detect()) == per_text
\ No newline at end of file
@@ -6,12 +6,9 @@ Test PII detection with real data from TestUseCase_TestFile.json
 import json
 import os
 import sys
+from collections import Counter
 from pathlib import Path
 
-# Add src to Python path so we can import our modules
-src_path = Path(__file__).parent.parent / 'src'
-sys.path.insert(0, str(src_path))
-
 from ..src.detection.pii_detector import PIIDetector
 
 def load_test_file():
@@ -93,6 +90,7 @@ def test_with_real_data():
     
     total_entities = 0
     payloads_with_pii = 0
+    entity_types = Counter()
     
     for i, payload in enumerate(payloads, 1):
         verbatim_id = payload.get('verbatim_id', f'unknown_{i}')
@@ -113,6 +111,7 @@ def test_with_real_data():
                       f"(confidence: {entity.confidence:.2f}, source: {entity.source})")
             total_entities += len(entities)
             payloads_with_pii += 1
+            entity_types.update(entity.entity_type for entity in entities)
         else:
             print("   ✅ No PII detected (clean)")
     
@@ -126,14 +125,8 @@ def test_with_real_data():
     print(f"   • Average entities per payload: {total_entities/len(payloads):.2f}")
     print(f"   • PII detection rate: {payloads_with_pii/len(payloads)*100:.1f}%")
     
-    # Show which types of PII were found
+    # Show which types of PII were found, as tallied during detection above
     if total_entities > 0:
-        entity_types = {}
-        for payload in payloads:
-            entities = detector.detect_pii(payload.get('sentence', ''))
-            for entity in entities:
-                entity_types[entity.entity_type] = entity_types.get(entity.entity_type, 0) + 1
-        
         print(f"\n📈 PII Types Detected:")
         for pii_type, count in sorted(entity_types.items()):
             print(f"   • {pii_type}: {count} occurrences")
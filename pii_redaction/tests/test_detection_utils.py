@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for detection_utils: the sorted deduplication sweep keeps the same
+entities as the original pairwise comparison, and EntityCache is an LRU.
+"""
+
+import random
+
+import pytest
+
+from ..src.detection import detection_utils
+from ..src.detection.detection_utils import EntityCache, deduplicate_entities, entities_overlap
+from ..src.detection.pii_entity import PIIEntity
+
+def _pairwise_deduplicate(entities):
+    """deduplicate_entities before the sweep: each entity checked against every kept one."""
+    deduplicated = []
+    for entity in sorted(entities, key=lambda x: x.start_pos):
+        for i, existing in enumerate(deduplicated):
+            if entities_overlap(entity, existing):
+                if entity.confidence > existing.confidence:
+                    deduplicated[i] = entity
+                break
+        else:
+            deduplicated.append(entity)
+    return sorted(deduplicated, key=lambda x: x.start_pos)
+
+def _random_entities(rng, count, lengths=(1, 2, 3, 5, 8, 13)):
+    entities = []
+    for _ in range(count):
+        start = rng.randint(0, 60)
+        end = start + rng.choice(lengths)
+        confidence = rng.choice([0.5, 0.8, 0.8, 0.93, 0.99])
+        entities.append(PIIEntity('x' * (end - start), 'NAME', start, end, confidence, 'REGEX'))
+    return entities
+
+def _assert_start_ordered_and_disjoint(entities):
+    for i, entity in enumerate(entities):
+        assert i == 0 or entities[i - 1].start_pos <= entity.start_pos
+        assert not any(entities_overlap(entity, other) for other in entities[i + 1:])
+
+def test_sweep_keeps_the_same_entities_as_pairwise_checks():
+    rng = random.Random(0)
+    for _ in range(2000):
+        entities = _random_entities(rng, rng.randint(0, 30))
+        deduplicated = deduplicate_entities(entities)
+
+        # Identity, not equality: ties must keep the same entity object
+        assert [id(e) for e in deduplicated] == [id(e) for e in _pairwise_deduplicate(entities)]
+        _assert_start_ordered_and_disjoint(deduplicated)
+
+def test_sweep_keeps_zero_length_entities_disjoint():
+    """Zero-length entities overlap nothing that starts where they do, yet must not hide later overlaps."""
+    rng = random.Random(0)
+    for _ in range(2000):
+        entities = _random_entities(rng, rng.randint(0, 30), lengths=(0, 0, 1, 2, 3, 5, 8, 13))
+        _assert_start_ordered_and_disjoint(deduplicate_entities(entities))
+
+    longer = PIIEntity('Smith', 'NAME', 5, 10, 0.8, 'REGEX')
+    empty = PIIEntity('', 'NAME', 5, 5, 0.8, 'REGEX')
+    inner = PIIEntity('mi', 'NAME', 6, 8, 0.8, 'REGEX')
+    assert deduplicate_entities([longer, empty, inner]) == [empty, longer]
+    assert deduplicate_entities([empty, PIIEntity('', 'NAME', 5, 5, 0.8, 'REGEX')]) == [empty, empty]
+
+def test_jit_sweep_matches_python_sweep():
+    if not detection_utils._load_jit_sweep():
+        pytest.skip("numba is not installed")
+    rng = random.Random(0)
+    for _ in range(200):
+        entities = _random_entities(rng, detection_utils.JIT_SWEEP_MIN_ENTITIES + rng.randint(0, 300))
+        starts = [entity.start_pos for entity in entities]
+        ends = [entity.end_pos for entity in entities]
+        confidences = [entity.confidence for entity in entities]
+        order = sorted(range(len(entities)), key=lambda i: (starts[i], -confidences[i]))
+
+        assert list(detection_utils._dedup_indices_jit(starts, ends, confidences)) == \
+            detection_utils._sweep_overlaps(order, starts, ends, confidences)
+        assert deduplicate_entities(entities) == _pairwise_deduplicate(entities)
+
+def test_entity_cache_evicts_least_recently_used():
+    cache = EntityCache(maxsize=2)
+    entity = PIIEntity('Anna', 'NAME', 0, 4, 0.9, 'REGEX')
+    cache.put('a', [entity])
+    cache.put('b', [])
+    assert cache.get('a') == (entity,)
+
+    cache.put('c', [])
+
+    assert cache.get('b') is None
+    assert cache.get('a') == (entity,)
+    assert cache.get('c') == ()
+    assert len(cache) == 2
+    assert cache.hit_rate() == pytest.approx(3 / 4)
\ No newline at end of file
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+File processing tests. Streamed, batched and pooled runs must write what
+redacting one payload at a time and json.dump-ing the list writes, and a
+job that fails must leave the files it was replacing as they were.
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from ..src.detection.pii_detector import PIIDetector
+from ..src.redaction.text_redactor import TextRedactor
+from ..src.processing import file_processor
+from ..src.processing.file_processor import FileProcessor, _JSONArrayWriter
+from ..src.processing.payload_processor import PayloadProcessor
+
+TEST_FILE = Path(__file__).parent / 'data' / 'input' / 'TestUseCase_TestFile.json'
+
+SENTENCES = [
+    "Customer John Smith called from john.smith@email.com",
+    "Please call me back at 555-123-4567 or (555) 987-6543",
+    "My address is 123 Main Street, Springfield, IL 62701",
+    "Thank you for your help today",
+    "My name is Maria Gonzalez and my SSN is 123-45-6789",
+    "Card number 4111 1111 1111 1111, expiring soon",
+    "Écrivez à zoë@exemple.fr, merci",
+    "Mhm.",
+    "",
+    "   ",
+]
+
+_TIMESTAMP_RE = re.compile(r'"redacted_at": "[^"]*"')
+
+def _sample_payloads():
+    """Test file payloads plus enough synthetic ones to span several batches."""
+    with open(TEST_FILE) as f:
+        payloads = json.load(f)
+
+    for i in range(120):
+        payloads.append({
+            "verbatim_id": 1000 + i,
+            "sentence": SENTENCES[i % len(SENTENCES)],
+            "notes": SENTENCES[(i * 7) % len(SENTENCES)] if i % 3 == 0 else None,
+            "type": "agent" if i % 2 else "client",
+            "sentiment": i / 8,
+            "attributes": {"overtalk": 0.053, "queuename": "sales_nst", "tags": ["a", "ü"]}
+        })
+    return payloads
+
+def _make_file_processor(max_workers=1, metadata_sidecar=False):
+    detector = PIIDetector(use_comprehend=False)
+    redactor = TextRedactor('placeholder')
+    payload_processor = PayloadProcessor(detector, redactor, batch_size=25, max_workers=max_workers)
+    return FileProcessor(payload_processor, metadata_sidecar=metadata_sidecar)
+
+def _baseline_output(payloads):
+    """Output of the original path: each payload processed alone, then json.dump."""
+    payload_processor = _make_file_processor().payload_processor
+    redacted = [payload_processor.process_payload(payload)[0] for payload in payloads]
+    return json.dumps(redacted, indent=2, ensure_ascii=False)
+
+def _without_timestamps(text):
+    return _TIMESTAMP_RE.sub('"redacted_at": null', text)
+
+def _write_input(tmp_path, payloads):
+    input_file = tmp_path / 'input.json'
+    input_file.write_text(json.dumps(payloads, indent=2))
+    return str(input_file)
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_pipeline_output_matches_baseline(tmp_path, max_workers):
+    """Streamed, batched output is byte-identical to the whole-file baseline."""
+    payloads = _sample_payloads()
+    input_file = _write_input(tmp_path, payloads)
+    output_file = str(tmp_path / 'output.json')
+
+    result = _make_file_processor(max_workers).process_file(input_file, output_file)
+
+    assert result.status == 'success'
+    assert result.total_payloads == len(payloads)
+    with open(output_file, encoding='utf-8') as f:
+        assert _without_timestamps(f.read()) == _without_timestamps(_baseline_output(payloads))
+    assert sorted(os.listdir(tmp_path)) == ['input.json', 'output.json']
+
+def test_streamed_payloads_match_whole_file_load(tmp_path):
+    """Incremental ijson parsing yields the same payloads as loading the whole file."""
+    pytest.importorskip('ijson')
+    payloads = _sample_payloads()
+    input_file = _write_input(tmp_path, payloads)
+    processor = _make_file_processor()
+
+    assert list(processor.iter_payloads(input_file)) == processor._load_json_file(input_file)
+
+def test_single_object_file_is_one_payload(tmp_path):
+    payload = _sample_payloads()[0]
+    input_file = tmp_path / 'single.json'
+    input_file.write_text(json.dumps(payload))
+
+    assert list(_make_file_processor().iter_payloads(str(input_file))) == [payload]
+
+@pytest.mark.parametrize('use_orjson', [True, False])
+def test_json_array_writer_matches_json_dump(tmp_path, monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(file_processor, 'orjson', None)
+    items = _sample_payloads() + [{}, [], "text\nwith newline", {"nested": {"empty": []}}, None, 1.5]
+
+    for count in (0, 1, len(items)):
+        output_file = tmp_path / f'array-{count}.json'
+        writer = _JSONArrayWriter(str(output_file))
+        for item in items[:count]:
+            writer.write(item)
+        writer.commit()
+
+        assert output_file.read_text(encoding='utf-8') == json.dumps(items[:count], indent=2, ensure_ascii=False)
+
+def test_output_keeps_the_destination_mode(tmp_path):
+    input_file = _write_input(tmp_path, _sample_payloads())
+    os.chmod(input_file, 0o600)
+
+    assert _make_file_processor().process_file_in_place(input_file).status == 'success'
+    assert os.stat(input_file).st_mode & 0o777 == 0o600
+
+def test_failed_job_leaves_existing_output_untouched(tmp_path, monkeypatch):
+    """Output only replaces the destination once the whole job succeeded."""
+    payloads = _sample_payloads()
+    input_file = _write_input(tmp_path, payloads)
+    output_file = tmp_path / 'output.json'
+    output_file.write_text('previous output')
+    processor = _make_file_processor()
+    iter_process_payloads = processor.payload_processor.iter_process_payloads
+
+    def fail_midway(payloads):
+        for i, item in enumerate(iter_process_payloads(payloads)):
+            if i == 50:
+                raise RuntimeError("detector crashed")
+            yield item
+
+    monkeypatch.setattr(processor.payload_processor, 'iter_process_payloads', fail_midway)
+    result = processor.process_file(input_file, str(output_file))
+
+    assert result.status == 'failed'
+    assert output_file.read_text() == 'previous output'
+    assert sorted(os.listdir(tmp_path)) == ['input.json', 'output.json']
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_metadata_sidecar_matches_embedded_metadata(tmp_path, max_workers):
+    """The sidecar holds the embedded _redaction_metadata, minus original text, one line per redaction."""
+    payloads = _sample_payloads()
+    input_file = _write_input(tmp_path, payloads)
+    embedded_file = str(tmp_path / 'embedded.json')
+    sidecar_file = str(tmp_path / 'sidecar.json')
+
+    assert _make_file_processor(max_workers).process_file(input_file, embedded_file).status == 'success'
+    assert _make_file_processor(max_workers, metadata_sidecar=True).process_file(
+        input_file, sidecar_file).status == 'success'
+
+    with open(embedded_file, encoding='utf-8') as f:
+        embedded = json.load(f)
+    with open(sidecar_file, encoding='utf-8') as f:
+        redacted = json.load(f)
+    with open(f"{sidecar_file}.meta.jsonl", encoding='utf-8') as f:
+        metadata_lines = [json.loads(line) for line in f]
+
+    expected_lines = []
+    for payload in embedded:
+        metadata = payload.pop('_redaction_metadata', None)
+        if metadata is None:
+            continue
+        for redaction in metadata['redactions']:
+            expected_lines.append({
+                'payload_id': payload['verbatim_id'],
+                'field_name': redaction['field_name'],
+                'entity_type': redaction['entity_type'],
+                'start': redaction['start_pos'],
+                'end': redaction['end_pos'],
+                'strategy': metadata['strategy_used']
+            })
+
+    assert redacted == embedded
+    assert expected_lines
+    for line in metadata_lines:
+        line.pop('redacted_at')
+    assert metadata_lines == expected_lines
+
+def test_in_place_processing_matches_baseline(tmp_path):
+    payloads = _sample_payloads()
+    input_file = _write_input(tmp_path, payloads)
+
+    result = _make_file_processor().process_file_in_place(input_file)
+
+    assert result.status == 'success'
+    with open(input_file, encoding='utf-8') as f:
+        assert _without_timestamps(f.read()) == _without_timestamps(_baseline_output(payloads))
+    assert not os.path.exists(f"{input_file}.backup")
+
+def test_hardlink_backup_survives_output_replace(tmp_path):
+    """The hardlinked backup keeps the original data once the output replaces the file."""
+    input_file = _write_input(tmp_path, _sample_payloads())
+    original = Path(input_file).read_bytes()
+    backup_file = f"{input_file}.backup"
+    processor = _make_file_processor()
+
+    processor._create_backup(input_file, backup_file)
+    assert os.path.samefile(input_file, backup_file)
+
+    writer = _JSONArrayWriter(input_file)
+    writer.write({"replaced": True})
+    writer.commit()
+
+    assert Path(backup_file).read_bytes() == original
+    assert not os.path.samefile(input_file, backup_file)
+
+def test_backup_falls_back_when_hardlink_fails(tmp_path, monkeypatch):
+    """Without hardlinks the backup is a reflink clone or a full copy of the same data."""
+    input_file = _write_input(tmp_path, _sample_payloads())
+    backup_file = f"{input_file}.backup"
+    Path(backup_file).write_text('stale backup')
+
+    def no_link(src, dst):
+        raise OSError("hardlinks not supported")
+
+    monkeypatch.setattr(file_processor.os, 'link', no_link)
+    _make_file_processor()._create_backup(input_file, backup_file)
+
+    assert Path(backup_file).read_bytes() == Path(input_file).read_bytes()
+    assert not os.path.samefile(input_file, backup_file)
+
+def test_previous_backup_survives_when_no_backup_can_be_made(tmp_path, monkeypatch):
+    input_file = _write_input(tmp_path, _sample_payloads())
+    backup_file = f"{input_file}.backup"
+    Path(backup_file).write_text('previous backup')
+
+    def fail(*args, **kwargs):
+        raise OSError("no space left on device")
+
+    monkeypatch.setattr(file_processor.os, 'link', fail)
+    monkeypatch.setitem(sys.modules, 'fcntl', None)
+    monkeypatch.setattr(file_processor.shutil, 'copy2', fail)
+    with pytest.raises(OSError):
+        _make_file_processor()._create_backup(input_file, backup_file)
+
+    assert Path(backup_file).read_text() == 'previous backup'
+    assert sorted(os.listdir(tmp_path)) == ['input.json', 'input.json.backup']
+
+def test_failed_in_place_job_keeps_original(tmp_path, monkeypatch):
+    input_file = _write_input(tmp_path, _sample_payloads())
+    original = Path(input_file).read_bytes()
+    processor = _make_file_processor()
+
+    def crash(payloads):
+        raise RuntimeError("detector crashed")
+        yield
+
+    monkeypatch.setattr(processor.payload_processor, 'iter_process_payloads', crash)
+    result = processor.process_file_in_place(input_file)
+
+    assert result.status == 'failed'
+    assert Path(input_file).read_bytes() == original
+    assert Path(f"{input_file}.backup").read_bytes() == original
\ No newline at end of file
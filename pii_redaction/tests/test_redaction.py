@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Redaction tests: pooled payload redaction, the NumPy overlap filter and
+the Aho-Corasick leak check must agree with their plain Python versions.
+"""
+
+import dataclasses
+import random
+import re
+
+import pytest
+
+from ..src.detection.pii_entity import PIIEntity
+from ..src.redaction import redaction_validator, text_redactor
+from ..src.redaction.payload_processor import PayloadProcessor
+from ..src.redaction.text_redactor import TextRedactor
+
+SENTENCES = [
+    "Customer John Smith called from john.smith@email.com",
+    "Please call me back at 555-123-4567 or (555) 987-6543",
+    "My name is Maria Gonzalez and my SSN is 123-45-6789",
+    "Thank you for your help today",
+    "Écrivez à zoë@exemple.fr, merci",
+    "",
+]
+
+ENTITY_PATTERNS = [
+    ('NAME', re.compile(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b')),
+    ('EMAIL', re.compile(r'\S+@\S+\.\w+')),
+    ('PHONE', re.compile(r'\(?\d{3}\)?[ -]\d{3}-\d{4}')),
+    ('SSN', re.compile(r'\d{3}-\d{2}-\d{4}')),
+]
+
+def _entities(text):
+    return sorted(
+        (PIIEntity(match.group(), entity_type, match.start(), match.end(), 0.9, 'REGEX')
+         for entity_type, pattern in ENTITY_PATTERNS for match in pattern.finditer(text)),
+        key=lambda entity: entity.start_pos
+    )
+
+def _payloads_with_entities(count):
+    payloads = [
+        {"verbatim_id": i, "sentence": SENTENCES[i % len(SENTENCES)], "notes": SENTENCES[(i * 5) % len(SENTENCES)]}
+        for i in range(count)
+    ]
+    detection_results = [
+        {field: _entities(payload[field]) for field in ('sentence', 'notes')}
+        for payload in payloads
+    ]
+    return payloads, detection_results
+
+def _drop_timestamps(payloads):
+    for payload in payloads:
+        if '_redaction_metadata' in payload:
+            payload['_redaction_metadata'] = dict(payload['_redaction_metadata'], redacted_at=None)
+    return payloads
+
+def test_pooled_redaction_keeps_input_order():
+    payloads, detection_results = _payloads_with_entities(50)
+    expected = _drop_timestamps(PayloadProcessor().process_multiple_payloads(payloads, detection_results))
+
+    with PayloadProcessor(max_workers=2, chunksize=3) as processor:
+        # The second call runs on the pool the first one started
+        for _ in range(2):
+            pooled = processor.process_multiple_payloads(payloads, detection_results)
+            assert _drop_timestamps(pooled) == expected
+        assert processor._pool is not None
+    assert processor._pool is None
+
+def _overlapping_entities(rng, text, count):
+    """Spans of up to 12 characters, many overlapping, about one in six empty."""
+    entities = []
+    for _ in range(count):
+        start = rng.randrange(len(text))
+        end = start if rng.random() < 0.15 else min(len(text), start + rng.randint(1, 12))
+        entities.append(PIIEntity(text[start:end], rng.choice(['NAME', 'PHONE', 'EMAIL']),
+                                  start, end, rng.random(), 'REGEX'))
+    return entities
+
+def _redact(redactor, text, entities):
+    return dataclasses.replace(redactor.redact_text(text, entities), redacted_at=None)
+
+@pytest.mark.parametrize('strategy_name', ['placeholder', 'mask'])
+def test_numpy_overlap_filter_matches_redaction_loop(monkeypatch, strategy_name):
+    pytest.importorskip('numpy')
+    rng = random.Random(0)
+    redactor = TextRedactor(strategy_name)
+    text = ' '.join(SENTENCES) * 4
+
+    cases = []
+    for _ in range(50):
+        count = text_redactor.NUMPY_OVERLAP_MIN_ENTITIES + rng.randint(0, 200)
+        cases.append(_overlapping_entities(rng, text, count))
+    numpy_results = [_redact(redactor, text, entities) for entities in cases]
+
+    monkeypatch.setattr(text_redactor, 'np', None)
+    for entities, result in zip(cases, numpy_results):
+        assert result == _redact(redactor, text, entities)
+
+def test_aho_corasick_leak_scan_matches_substring_scan():
+    if redaction_validator.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    rng = random.Random(0)
+    text = ' '.join(SENTENCES + ["Große STRASSE İstanbul", "ǅemal ﬁle Ωmega"]).casefold()
+
+    for _ in range(200):
+        count = redaction_validator.AHOCORASICK_MIN_PATTERNS + rng.randint(0, 40)
+        patterns = set()
+        for _ in range(count):
+            start = rng.randrange(len(text))
+            pattern = text[start:start + rng.randint(0, 15)]
+            # Some patterns are nudged so they no longer occur in the text
+            patterns.add(pattern + 'ǉ' if rng.random() < 0.3 else pattern)
+
+        assert redaction_validator._find_present(patterns, text) == {
+            pattern for pattern in patterns if pattern in text
+        }
\ No newline at end of file
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+RegexDetector must find exactly what its original loop found:
+every pattern in PII_PATTERNS run over every text.
+"""
+
+import random
+import re
+import sys
+
+import pytest
+
+from ..src.detection import regex_detector
+from ..src.detection.pii_entity import PIIEntity
+from ..src.detection.pii_patterns import PII_PATTERNS, is_false_positive
+from ..src.detection.regex_detector import RegexDetector
+
+def _detect_with_every_pattern(text, confidence=0.8):
+    """Original RegexDetector.detect, without any prefilter."""
+    if not text or not text.strip():
+        return []
+
+    entities = []
+    for entity_type, patterns in PII_PATTERNS.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                group = 1 if entity_type == 'NAME' and match.groups() else 0
+                matched_text = match.group(group)
+                if len(matched_text.strip()) >= 2 and not is_false_positive(entity_type, matched_text):
+                    entities.append(PIIEntity(matched_text, entity_type, match.start(group),
+                                              match.end(group), confidence, 'REGEX'))
+    return entities
+
+def _corpus():
+    corpus = [
+        "Customer John Smith called from john.smith@email.com",
+        "Please call me back at 555-123-4567 or (555) 987-6543",
+        "My address is 123 Main Street, Springfield, IL 62701",
+        "My name is Maria Gonzalez and my SSN is 123-45-6789",
+        "Card number 4111 1111 1111 1111, expiring soon",
+        "Reach me at JANE.DOE@EXAMPLE.ORG\x0bor 555.321.9876",
+        "Test Lane, 42 New York Ave, Boston",
+        "call 555 123 4567\x1cnow", "zip 02134", "ssn 123456789", "a@b", "@gmail",
+        "My name is Test", "Ünïcode 123-45-6789 und Straße 5, Köln", "x" * 300 + " 4111111111111111",
+        "Thank you for your help today", "Mhm.", "", "   ",
+    ]
+    rng = random.Random(0)
+    alphabet = "aZ09 @.,-()\n\x0b\x1cé"
+    corpus += [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(300)]
+    return corpus
+
+def test_re_prefilter_matches_every_pattern_scan():
+    detector = RegexDetector()
+    detector._hyperscan_db = None
+    detector._re2_gates = None
+
+    for text in _corpus():
+        assert detector.detect(text) == _detect_with_every_pattern(text), text
+
+@pytest.mark.parametrize('engine', ['hyperscan', 're2'])
+def test_engine_prefilter_matches_every_pattern_scan(engine):
+    pytest.importorskip(engine)
+    detector = RegexDetector()
+    if engine == 're2':
+        detector._hyperscan_db = None
+        detector._re2_gates = detector._init_re2_gates()
+
+    for text in _corpus():
+        assert detector.detect(text) == _detect_with_every_pattern(text), text
+
+def test_regex_without_hyperscan_or_re2_matches_every_pattern_scan(monkeypatch):
+    """Missing optional engines fall back to re with identical results."""
+    monkeypatch.setitem(sys.modules, 'hyperscan', None)
+    monkeypatch.setitem(sys.modules, 're2', None)
+    detector = RegexDetector()
+
+    assert detector._hyperscan_db is None and detector._re2_gates is None
+    for text in _corpus():
+        assert detector.detect(text) == _detect_with_every_pattern(text), text
+
+def test_hyperscan_database_loads_from_disk_cache(tmp_path, monkeypatch):
+    hyperscan = pytest.importorskip('hyperscan')
+    monkeypatch.setattr(regex_detector, 'HYPERSCAN_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(regex_detector, '_COMPILED_ENGINES', {})
+    RegexDetector()
+    assert [path.suffix for path in tmp_path.iterdir()] == ['.db']
+
+    # A fresh process finds the database on disk instead of compiling it
+    def no_compile():
+        raise AssertionError("database compiled despite the disk cache")
+
+    monkeypatch.setattr(regex_detector, '_COMPILED_ENGINES', {})
+    monkeypatch.setattr(hyperscan, 'Database', no_compile)
+    detector = RegexDetector()
+
+    assert detector._hyperscan_db is not None
+    for text in _corpus():
+        assert detector.detect(text) == _detect_with_every_pattern(text), text
\ No newline at end of file